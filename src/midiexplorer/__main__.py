@@ -11,16 +11,12 @@ MIDI Explorer main program.
 import dearpygui.dearpygui as dpg  # https://dearpygui.readthedocs.io/en/latest/
 
 import midiexplorer.gui
-from midiexplorer.midi.ports import midi_in_queue
-from midiexplorer.midi.timestamp import Timestamp
 
 
 def main() -> None:
     """Entry point and main loop.
 
     """
-    Timestamp()  # Initializes start time ASAP
-
     dpg.create_context()
 
     midiexplorer.gui.init()
@@ -35,13 +31,18 @@ def main() -> None:
         if dpg.get_value('input_mode') == 'Polling':
             midiexplorer.gui.windows.conn.poll_processing()
 
-        # Process MIDI inputs data
-        while not midi_in_queue.empty():
-            midiexplorer.gui.windows.conn.handle_received_data(*midi_in_queue.get())
+        # Process MIDI inputs data within the frame time budget
+        midiexplorer.gui.windows.conn.process_received_data()
+
+        # Render the visible history rows
+        midiexplorer.gui.windows.hist.data.refresh()
 
-        # Update monitor visual cues
+        # Update monitor visual cues once per frame
         midiexplorer.gui.windows.mon.blink.update_mon_status()
 
+        # Load SMF in chunks
+        midiexplorer.gui.windows.smf.update()
+
         # Render DPG frame
         dpg.render_dearpygui_frame()
 
@@ -7,8 +7,19 @@
 """
 Data conversions.
 """
+import functools
+
 from dearpygui import dearpygui as dpg
 
+UNIT_NAMES = {
+    'X': "Hexadecimal",
+    'd': "Decimal",
+    'b': "Binary",
+    'c': "Character",
+}
+SCALAR_CACHE_SIZE = 1024  # Single values conversions kept
+NBSP = '\u00A0'  # Non-breaking space used for alignment
+
 
 def add_string_value_preconv(tag: str) -> None:
     """Add string value with pre-converted values.
@@ -23,34 +34,71 @@ def add_string_value_preconv(tag: str) -> None:
     dpg.add_string_value(tag=f'{tag}_dec')
 
 
+@functools.lru_cache(maxsize=None)  # Only a handful of unit, length and padding combinations are used
+def _get_table(unit: chr, length: int, padding: int) -> tuple[str, ...]:
+    """Precomputed conversions of all byte values.
+
+    :param unit: Unit to convert to (Format specification type)
+    :param length: Conversion length
+    :param padding: Prefixed padding length
+    :return: Text representations by value.
+
+    """
+    return tuple(f"{NBSP:{padding}}{value:0{length}{unit}}" for value in range(256))
+
+
+@functools.lru_cache(maxsize=None)
+def _get_prefix(unit: chr) -> str:
+    """Unit name prefix.
+
+    :param unit: Unit to convert to (Format specification type)
+    :return: Padded unit name.
+
+    """
+    unit_name = UNIT_NAMES.get(unit, "Unknown")
+    unit_name_padding = 12 - len(unit_name)
+    return f"{unit_name}:{NBSP:{unit_name_padding}}"
+
+
+@functools.lru_cache(maxsize=SCALAR_CACHE_SIZE)
+def _convert_scalar(unit: chr, value: int, length, padding) -> str:
+    """Converts a single integer to a text representation in the specified unit.
+
+    :param unit: Unit to convert to (Format specification type)
+    :param value: Value to convert
+    :param length: Conversion length
+    :param padding: Prefixed padding length
+    :return: Text representation of value in unit format
+    """
+    if 0 <= value <= 0xFF:
+        converted_value = _get_table(unit, length, padding)[value]
+    else:
+        converted_value = f"{NBSP:{padding}}{value:0{length}{unit}}"
+    return f"{_get_prefix(unit)}{converted_value.rstrip()}"
+
+
 def convert_to(unit: chr, values: int | tuple[int] | list[int], length, padding) -> str:
     """Converts a single integer or a group to a text representation in the specified unit.
 
+    Byte values are converted through precomputed tables and single values are memoized.
+
     :param unit: Unit to convert to (Format specification type)
     :param values: Value(s) to convert
     :param length: Conversion length
     :param padding: Prefixed padding length
     :return: Text representation of value(s) in unit format
     """
-    unit_name = "Unknown"
-    if unit == 'X':
-        unit_name = "Hexadecimal"
-    if unit == 'd':
-        unit_name = "Decimal"
-    if unit == 'b':
-        unit_name = "Binary"
-    if unit == 'c':
-        unit_name = "Character"
-    unit_name_padding = 12 - len(unit_name)
-
-    converted_values = ""
-    if values is not None:
-        if isinstance(values, int):
-            converted_values += f"{' ':{padding}}{values:0{length}{unit}}"
-        else:
-            for value in values:
-                converted_values += f"{' ':{padding}}{value:0{length}{unit}}"
-    return f"{unit_name}:{' ':{unit_name_padding}}{converted_values.rstrip()}"
+    if values is None:
+        return _get_prefix(unit)
+    if isinstance(values, int):
+        return _convert_scalar(unit, values, length, padding)
+    if isinstance(values, (bytes, bytearray, memoryview)) \
+            or (min(values, default=0) >= 0 and max(values, default=0) <= 0xFF):
+        table = _get_table(unit, length, padding)
+        converted_values = ''.join([table[value] for value in values])
+    else:  # Out of byte range
+        converted_values = ''.join([f"{NBSP:{padding}}{value:0{length}{unit}}" for value in values])
+    return f"{_get_prefix(unit)}{converted_values.rstrip()}"
 
 
 def conv2hex(values: int | tuple[int] | list[int], length: int = 2, padding: int = 7) -> str:
@@ -101,7 +149,7 @@ def set_value_preconv(source: str, value: int | tuple[int] | list[int]) -> None:
     :param source: Value source tag name
     :param value: Value to set
     """
-    dpg.set_value(source, str(value))
+    dpg.set_value(source, str(tuple(value) if isinstance(value, memoryview) else value))
     if source == 'syx_payload':
         dpg.set_value(f'{source}_char', conv2char(value))
     dpg.set_value(f'{source}_hex', conv2hex(value))
@@ -132,6 +180,63 @@ def tooltip_conv(title: str, values: int | tuple[int] | list[int] | None = None,
             dpg.add_text(f"{bconv}")
 
 
+def add_tooltip_conv() -> tuple[int, int, int, int, int]:
+    """Adds an updatable tooltip for data converted to hexadecimal, decimal and binary.
+
+    :return: Title text, conversions group, hexadecimal, decimal and binary texts items.
+
+    """
+    with dpg.tooltip(dpg.last_item()):
+        title = dpg.add_text()
+        with dpg.group() as group:
+            dpg.add_text()
+            hconv = dpg.add_text()
+            dconv = dpg.add_text()
+            bconv = dpg.add_text()
+    return title, group, hconv, dconv, bconv
+
+
+def get_tooltip_conv(title: str, values: int | tuple[int] | list[int] | None = None,
+                     hlen: int = 2, dlen: int = 3, blen: int = 8) -> tuple[str, tuple[str, str, str] | None]:
+    """Computes the contents of a tooltip created by add_tooltip_conv().
+
+    :param title: Tooltip title.
+    :param values: Tooltip value(s)
+    :param hlen: Hexadecimal length
+    :param dlen: Decimal length
+    :param blen: Binary length
+    :return: Title and hexadecimal, decimal and binary conversions if any.
+
+    """
+    if values is None:
+        return f"{title}", None
+    return f"{title}", (
+        conv2hex(values, hlen, blen - hlen + 1),
+        conv2dec(values, dlen, blen - dlen + 1),
+        conv2bin(values, blen),
+    )
+
+
+def set_tooltip_conv(items: tuple[int, int, int, int, int], title: str,
+                     conversions: tuple[str, str, str] | None = None) -> None:
+    """Updates a tooltip created by add_tooltip_conv().
+
+    :param items: Tooltip items.
+    :param title: Tooltip title.
+    :param conversions: Hexadecimal, decimal and binary conversions from get_tooltip_conv().
+
+    """
+    title_item, group, hconv, dconv, bconv = items
+    dpg.set_value(title_item, title)
+    if conversions is None:
+        dpg.hide_item(group)
+        return
+    dpg.set_value(hconv, conversions[0])
+    dpg.set_value(dconv, conversions[1])
+    dpg.set_value(bconv, conversions[2])
+    dpg.show_item(group)
+
+
 def tooltip_preconv(static_title: str | None = None, title_value_source: str | None = None,
                     values_source: str | None = None) -> None:
     """Adds a tooltip with pre-converted data.
@@ -0,0 +1,200 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Virtualized hexadecimal viewer.
+"""
+from typing import Any, Callable, Optional
+
+from dearpygui import dearpygui as dpg
+
+LINES = 24  # Number of rendered lines
+LINE_BYTES = 0x10  # Bytes per line
+WHEEL_LINES = 3  # Lines scrolled per mouse wheel step
+HEX = tuple(f"{value:02X}" for value in range(256))  # By byte value
+ASCII = bytes(value if 0x20 <= value < 0x7F else ord('.') for value in range(256))  # Printable or dot by byte value
+
+
+class HexView:
+    """Hexadecimal and ASCII dump of a buffer.
+
+    Only the visible lines exist and are recycled while scrolling through the buffer.
+
+    """
+
+    def __init__(self, parent: int | str, buffer: bytes, callback: Optional[Callable[[int], None]] = None,
+                 width: int = 640) -> None:
+        """Creates the viewer.
+
+        :param parent: Parent container.
+        :param buffer: Contents to display. Any object supporting the buffer protocol and slicing, such as mmap.
+        :param callback: Called with the offset of the clicked byte.
+        :param width: Width in pixels.
+
+        """
+        self.buffer = buffer
+        self.callback = callback
+        self.top = 0  # First displayed line
+        self.selection = range(0)  # Highlighted offsets
+        self.dirty = True
+        self._digits = len(f"{len(buffer):X}")
+        self._rows: list[dict[str, Any]] = []
+
+        group = dpg.add_group(parent=parent, horizontal=True)
+        self._container = dpg.add_child_window(parent=group, width=width, height=(LINES + 1) * 21, border=False,
+                                               no_scrollbar=True)
+        self._scrollbar = dpg.add_slider_int(parent=group, vertical=True, width=20, height=(LINES + 1) * 21,
+                                             min_value=0, max_value=self._max_top(), default_value=self._max_top(),
+                                             format="", callback=self._scroll_bar)
+        self._handlers = dpg.add_handler_registry()
+        dpg.add_mouse_wheel_handler(parent=self._handlers, callback=self._scroll_wheel)
+
+        table = dpg.add_table(parent=self._container, header_row=True, policy=dpg.mvTable_SizingStretchProp,
+                              borders_innerH=False, borders_outerH=True,
+                              borders_innerV=False, borders_outerV=True)
+        dpg.add_table_column(label="Offset (hex)", parent=table)
+        for index in range(LINE_BYTES):
+            dpg.add_table_column(label=f"{index:02X}", parent=table)
+        dpg.add_table_column(label="Decoded (ASCII)", parent=table)
+
+        for line in range(LINES):
+            row = dpg.add_table_row(parent=table)
+            self._rows.append({
+                'row': row,
+                'offset': dpg.add_text(parent=row),
+                'bytes': tuple(
+                    dpg.add_selectable(parent=row, callback=self._selected, user_data=(line, index))
+                    for index in range(LINE_BYTES)
+                ),
+                'ascii': dpg.add_text(parent=row),
+            })
+
+    def delete(self) -> None:
+        """Deletes the global handlers.
+
+        The widgets are deleted along with their parent.
+
+        """
+        if dpg.does_item_exist(self._handlers):
+            dpg.delete_item(self._handlers)
+
+    def _lines(self) -> int:
+        """Number of lines in the buffer.
+
+        :return: Lines count.
+
+        """
+        return (len(self.buffer) + LINE_BYTES - 1) // LINE_BYTES
+
+    def _max_top(self) -> int:
+        """Last possible first displayed line.
+
+        :return: Line number.
+
+        """
+        return max(self._lines() - LINES, 0)
+
+    def scroll_to(self, top: int) -> None:
+        """Scrolls the view.
+
+        :param top: First line to display.
+
+        """
+        top = min(max(top, 0), self._max_top())
+        if top != self.top:
+            self.top = top
+            self.dirty = True
+
+    def select(self, start: int, length: int = 1) -> None:
+        """Highlights a portion of the buffer and scrolls to it if needed.
+
+        :param start: First offset.
+        :param length: Number of bytes.
+
+        """
+        self.selection = range(start, start + length)
+        line = start // LINE_BYTES
+        if not self.top <= line < self.top + LINES:
+            self.scroll_to(line - LINES // 2)
+        self.dirty = True
+
+    def _scroll_bar(self, sender: int | str, app_data: Any, user_data: Optional[Any]) -> None:
+        """Scrollbar callback.
+
+        :param sender: argument is used by DPG to inform the callback
+                       which item triggered the callback by sending the tag
+                       or 0 if trigger by the application.
+        :param app_data: argument is used DPG to send information to the callback
+                         i.e. the current value of most basic widgets.
+        :param user_data: argument is Optionally used to pass your own python data into the function.
+
+        """
+        # The vertical slider minimum is at the bottom
+        self.scroll_to(self._max_top() - app_data)
+
+    def _scroll_wheel(self, sender: int | str, app_data: Any, user_data: Optional[Any]) -> None:
+        """Mouse wheel callback scrolling the view when hovered.
+
+        :param sender: argument is used by DPG to inform the callback
+                       which item triggered the callback by sending the tag
+                       or 0 if trigger by the application.
+        :param app_data: argument is used DPG to send information to the callback
+                         i.e. the current value of most basic widgets.
+        :param user_data: argument is Optionally used to pass your own python data into the function.
+
+        """
+        if dpg.is_item_hovered(self._container):
+            self.scroll_to(self.top - app_data * WHEEL_LINES)
+
+    def _selected(self, sender: int | str, app_data: Any, user_data: Optional[Any]) -> None:
+        """Byte click callback.
+
+        :param sender: argument is used by DPG to inform the callback
+                       which item triggered the callback by sending the tag
+                       or 0 if trigger by the application.
+        :param app_data: argument is used DPG to send information to the callback
+                         i.e. the current value of most basic widgets.
+        :param user_data: argument is Optionally used to pass your own python data into the function.
+
+        """
+        line, index = user_data
+        offset = (self.top + line) * LINE_BYTES + index
+        if offset >= len(self.buffer):
+            return
+        self.select(offset)
+        if self.callback is not None:
+            self.callback(offset)
+
+    def refresh(self) -> None:
+        """Renders the visible lines if they changed.
+
+        Called once per frame.
+
+        """
+        if not self.dirty:
+            return
+        self.dirty = False
+
+        max_top = self._max_top()
+        dpg.set_value(self._scrollbar, max_top - self.top)
+        buffer = self.buffer
+        selection = self.selection
+        for line, widgets in enumerate(self._rows):
+            offset = (self.top + line) * LINE_BYTES
+            chunk = buffer[offset:offset + LINE_BYTES]
+            if not chunk:
+                dpg.hide_item(widgets['row'])
+                continue
+            dpg.show_item(widgets['row'])
+            dpg.set_value(widgets['offset'], f"{offset:0{self._digits}X}")
+            for index, item in enumerate(widgets['bytes']):
+                if index < len(chunk):
+                    dpg.configure_item(item, label=HEX[chunk[index]], enabled=True)
+                    dpg.set_value(item, offset + index in selection)
+                else:  # We may reach the end of the buffer earlier than the line width
+                    dpg.configure_item(item, label="", enabled=False)
+                    dpg.set_value(item, False)
+            dpg.set_value(widgets['ascii'], chunk.translate(ASCII).decode('ascii'))
@@ -7,12 +7,52 @@
 """
 Standard MIDI File (SMF) menus callbacks.
 """
+import queue
 
 from dearpygui import dearpygui as dpg
 from mido import MidiFile
 
 import midiexplorer.gui.windows.smf
 from midiexplorer.__config__ import DEBUG
+from midiexplorer.midi.smf import StandardMidiFile
+
+
+def parse(filename: str, request: int, results: queue.SimpleQueue) -> None:
+    """Reads and decodes an SMF.
+
+    Runs in a worker thread: the GUI must not be touched.
+
+    :param filename: SMF path.
+    :param request: Load request number.
+    :param results: Queue to put the (request, filename, smf_file, midifile, error) result to.
+                    The midifile is None for files other than SMF.
+
+    """
+    smf_file = None
+    try:
+        # Raw file
+        smf_file = StandardMidiFile(filename)
+        if not smf_file.is_smf:
+            # Other files are only displayed raw
+            results.put((request, filename, smf_file, None, None))
+            return
+
+        # Events index. Only needed for highlighting: the file is still decoded without it.
+        try:
+            smf_file.index()
+        except ValueError:
+            pass
+
+        # Decoded file, read from the map
+        mid = MidiFile(filename, file=smf_file.buffer, clip=True, debug=DEBUG,
+                       # charset='ascii',
+                       )
+    except (OSError, EOFError, ValueError) as error:
+        if smf_file is not None:
+            smf_file.close()
+        results.put((request, filename, None, None, error))
+        return
+    results.put((request, filename, smf_file, mid, None))
 
 
 def _do_load(_, app_data) -> None:
@@ -27,18 +67,7 @@ def _do_load(_, app_data) -> None:
     # Logger().log_debug(f"{app_data!r}")
     filename = app_data['file_path_name']
 
-    # Raw file
-    with open(filename, 'rb') as file:
-        contents = file.read()
-    # Logger().log_debug(f"{contents!r}")
-
-    # Decoded file
-    mid = MidiFile(filename, clip=True, debug=DEBUG,
-                   # charset='ascii',
-                   )
-    # Logger().log_debug(f"{mid!r}")
-
-    midiexplorer.gui.windows.smf.populate(contents, mid)
+    midiexplorer.gui.windows.smf.load(filename)
 
 
 def _do_save_as(_, app_data) -> None:
@@ -57,10 +86,10 @@ def _set_supported_extensions() -> None:
     dpg.add_file_extension('.mid')
     dpg.add_file_extension('.midi')
     dpg.add_file_extension('.smf')
+    dpg.add_file_extension('.syx')  # Raw contents only
     if DEBUG:  # TODO: Implement these formats!
         dpg.add_file_extension('.rmid')
         dpg.add_file_extension('.xmf')
-        dpg.add_file_extension('.syx')
         dpg.add_file_extension('.kar')
 
 
@@ -117,4 +146,4 @@ def close_file() -> None:
     """Closes the current SMF.
 
     """
-    midiexplorer.gui.windows.smf.init()
+    midiexplorer.gui.windows.smf.close()
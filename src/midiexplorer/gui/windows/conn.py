@@ -10,7 +10,8 @@ Connections window and management.
 TODO: separate presentation from processing logic
 """
 import platform
-from collections import OrderedDict
+import time
+from collections import OrderedDict, deque
 from typing import Optional, Any
 
 import mido
@@ -21,9 +22,23 @@ from midiexplorer.gui.helpers.callbacks.debugging import enable as enable_dpg_cb
 from midiexplorer.gui.helpers.constants.slots import Slots
 from midiexplorer.gui.helpers.logger import Logger
 from midiexplorer.gui.helpers.probe import add
-from midiexplorer.midi.ports import MidiInPort, MidiOutPort, midi_in_queue, midi_in_lock
+from midiexplorer.midi.decoders.message import decode
+from midiexplorer.midi.ports import MidiInPort, MidiOutPort, midi_in_ports, receive_pending, set_sysex_max_size, \
+    sysex_max_size
+from midiexplorer.midi import timestamp as midi_timestamp
 from midiexplorer.midi.timestamp import Timestamp
 
+S2MS = 1000  # Seconds to milliseconds ratio
+MIB = 1024 * 1024  # Bytes to mebibytes ratio
+
+###
+# GLOBAL VARIABLES
+#
+# FIXME: global variables should ideally be eliminated as they are a poor programming style
+###
+midi_in_backlog = deque()  # Received messages carried over to the next frame
+sysex_reported: dict[MidiInPort, tuple[int, int]] = {}  # Last reported system exclusive progress and discarded count
+
 
 def _install_input_callback(in_port: MidiInPort, dest: MidiOutPort | str):
     """Opens a MIDI Input Port and set its callback if required.
@@ -264,12 +279,12 @@ def delink_node_callback(sender: int | str,
         pin1_user_data: MidiInPort
         pin2_user_data: MidiOutPort
         logger.log_info(f"Detaching & closing MIDI port {pin1_user_data.label} from {pin2_user_data.label}.")
-        pin1_user_data.close()
+        _close_input(pin1_user_data)
         pin2_user_data.close()
     elif isinstance(pin1_user_data, MidiInPort):
         pin1_user_data: MidiInPort
         logger.log_info(f"Detaching & closing MIDI port {pin1_user_data.label} from the probe In.")
-        pin1_user_data.close()
+        _close_input(pin1_user_data)
         dpg.set_item_user_data(pin2, None)
     elif isinstance(pin2_user_data, MidiOutPort):
         pin2_user_data: MidiOutPort
@@ -419,6 +434,7 @@ def create() -> None:
     """
     with dpg.value_registry():
         dpg.add_string_value(tag='input_mode', default_value='Callback')
+        dpg.add_float_value(tag='input_budget', default_value=.004)  # seconds
 
     # FIXME: compute dynamically?
     conn_win_height = 510
@@ -456,6 +472,23 @@ def create() -> None:
                         source='input_mode',
                         callback=input_mode_callback
                     )
+                with dpg.group(horizontal=True):
+                    dpg.add_text("Processing budget:")
+                    dpg.add_slider_float(
+                        tag='input_budget_slider',
+                        label="ms per frame",
+                        min_value=1, max_value=16, default_value=dpg.get_value('input_budget') * S2MS,
+                        callback=lambda: dpg.set_value('input_budget',
+                                                       dpg.get_value('input_budget_slider') / S2MS)
+                    )
+                with dpg.group(horizontal=True):
+                    dpg.add_text("SysEx maximum size:")
+                    dpg.add_slider_int(
+                        tag='sysex_max_size_slider',
+                        label="MiB",
+                        min_value=1, max_value=256, default_value=sysex_max_size // MIB,
+                        callback=lambda: set_sysex_max_size(dpg.get_value('sysex_max_size_slider') * MIB)
+                    )
 
             with dpg.menu(label="Ports"):
                 dpg.add_menu_item(
@@ -641,9 +674,11 @@ def toggle(sender: int | str, app_data: Any, user_data: Optional[Any]) -> None:
     dpg.configure_item('conn_win', show=not dpg.is_item_visible('conn_win'))
 
 
-def handle_received_data(timestamp: Timestamp, source: str, dest: str, midi_data: mido.Message) -> None:
+def handle_received_data(timestamp: Timestamp, source: str, dest: str, midi_data: bytes) -> None:
     """Handles received MIDI data and echoes "Soft Thru" messages.
 
+    Echoed data is sent as is. Data is only decoded when presented by the probe.
+
     :param timestamp: MIDI data timestamp.
     :param source: Source MIDI port.
     :param dest: Destination MIDI port or module.
@@ -652,7 +687,7 @@ def handle_received_data(timestamp: Timestamp, source: str, dest: str, midi_data
     """
     logger = Logger()
 
-    logger.log_debug(f"Received MIDI data from {source} to {dest} at {timestamp}: {midi_data}")
+    logger.log_debug(f"Received MIDI data from {source} to {dest} at {timestamp}: {midi_data.hex(' ')}")
 
     port = None
     try:
@@ -662,17 +697,22 @@ def handle_received_data(timestamp: Timestamp, source: str, dest: str, midi_data
         pass
     if isinstance(port, MidiOutPort):
         logger.log_debug(f"Echoing MIDI data to midi output {port.label}")
-        port.port.send(midi_data)
+        port.send_raw(midi_data)
     if dest == 'probe_in':
         probe_thru_user_data = dpg.get_item_user_data('probe_thru')
         if probe_thru_user_data:
             # logger.log_debug(f"Probe thru has user data: {probe_thru_user_data}")
             logger.log_debug("Echoing MIDI data to probe thru")
-            probe_thru_user_data.port.send(midi_data)
+            probe_thru_user_data.send_raw(midi_data)
+        try:
+            midi_message = decode(midi_data)
+        except ValueError as error:
+            logger.log_warning(f"Ignoring invalid MIDI data from {source}: {error!s}")
+            return
         add(
             timestamp=timestamp,
             source=source,
-            data=midi_data,
+            data=midi_message,
         )
 
 
@@ -688,7 +728,7 @@ def poll_processing() -> None:
 
     """
     # Get the system timestamp ASAP
-    timestamp = Timestamp()
+    now = midi_timestamp.now()
 
     # TODO: subscribe pattern for multi module handling?
 
@@ -701,11 +741,76 @@ def poll_processing() -> None:
     # for input in inputs:
     #     for midi_message in input.port.iter_pending():
     #         timestamp = time.perf_counter()
-    #         queue.put((timestamp, input.label, input.dest, midi_message))
+    #         input.queue.push(bytes(midi_message.bytes()), now)
 
     probe_in_user_data = dpg.get_item_user_data('probe_in')
     if probe_in_user_data:
         # logger.log_debug(f"Probe input has user data: {probe_in_user_data}")
         for midi_message in probe_in_user_data.port.iter_pending():
-            with midi_in_lock:
-                midi_in_queue.put((timestamp, probe_in_user_data.label, probe_in_user_data.dest, midi_message))
+            probe_in_user_data.queue.push(bytes(midi_message.bytes()), now)
+
+
+def _handle_pending() -> None:
+    """Handles the oldest message from the backlog.
+
+    Messages from ports closed in the meantime are discarded.
+
+    """
+    timestamp, port, data = midi_in_backlog.popleft()
+    if port.dest is not None:
+        handle_received_data(timestamp, port.label, port.dest, data)
+
+
+def _close_input(port: MidiInPort) -> None:
+    """Closes an input port and forgets its system exclusive reports.
+
+    :param port: Input port.
+
+    """
+    port.close()
+    sysex_reported.pop(port, None)
+
+
+def _report_sysex() -> None:
+    """Logs the system exclusive messages reception progress.
+
+    Only the changes since the last report are logged.
+
+    """
+    for port in midi_in_ports:
+        report = (port.sysex_progress, port.sysex_discarded)
+        last = sysex_reported.get(port, (0, 0))
+        if report == last:
+            continue
+        sysex_reported[port] = report
+        if report[1] > last[1]:
+            Logger().log_warning(f"Discarded {report[1] - last[1]} incomplete or oversized "
+                                 f"system exclusive message(s) from {port.label}.")
+        if report[0]:
+            Logger().log_debug(f"Receiving system exclusive message from {port.label}: {report[0]} bytes.")
+
+
+def process_received_data() -> int:
+    """Processes received MIDI data within the frame time budget.
+
+    Every pending message is retrieved from the input ports queues at once.
+    Messages are then handled until the processing budget is exhausted
+    and the remainder is carried over to the next frame.
+    At least one message is always handled so that the backlog keeps draining.
+
+    :return: Number of messages deferred to the next frame.
+
+    """
+    receive_pending(midi_in_backlog)
+    _report_sysex()
+
+    if midi_in_backlog:
+        deadline = time.perf_counter() + dpg.get_value('input_budget')
+        _handle_pending()
+        while midi_in_backlog and time.perf_counter() < deadline:
+            _handle_pending()
+
+    deferred = len(midi_in_backlog)
+    if deferred:
+        Logger().log_debug(f"Processing budget exhausted: {deferred} message(s) deferred to the next frame.")
+    return deferred
@@ -7,6 +7,7 @@
 """
 Generator window and management.
 """
+import functools
 import time
 from typing import Any, Optional
 
@@ -17,8 +18,16 @@ import midiexplorer.gui.windows.hist.data
 from midiexplorer.__config__ import DEBUG
 from midiexplorer.gui.helpers.callbacks.debugging import enable as enable_dpg_cb_debugging
 from midiexplorer.gui.helpers.logger import Logger
+from midiexplorer.midi.decoders.message import decode as decode_message
 from midiexplorer.midi.timestamp import Timestamp
 
+###
+# GLOBAL VARIABLES
+#
+# FIXME: global variables should ideally be eliminated as they are a poor programming style
+###
+last_sent: Timestamp | None = None
+
 
 def create() -> None:
     """Creates the generator window.
@@ -121,8 +130,10 @@ def send(sender: int | str, app_data: Any, user_data: Optional[Any]) -> None:
 
     """
 
+    global last_sent
+
     # Compute timestamp and delta ASAP
-    timestamp = Timestamp()
+    timestamp = Timestamp.now(last_sent)
 
     logger = Logger()
 
@@ -132,7 +143,10 @@ def send(sender: int | str, app_data: Any, user_data: Optional[Any]) -> None:
     port = dpg.get_item_user_data('gen_out')
     if port:
         port.port.send(user_data)
-        midiexplorer.gui.windows.hist.data.add(data=user_data, source='Generator', destination=port.label,
-                                               timestamp=timestamp)
+        last_sent = timestamp
+        # Recorded from the main thread
+        midiexplorer.gui.windows.hist.data.actions.put(functools.partial(
+            midiexplorer.gui.windows.hist.data.add, data=decode_message(bytes(user_data.bytes())),
+            source='Generator', destination=port.label, timestamp=timestamp))
     else:
         logger.log_warning("Generator output is not connected to anything.")
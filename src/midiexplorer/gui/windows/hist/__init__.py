@@ -13,7 +13,9 @@ from dearpygui import dearpygui as dpg
 
 from midiexplorer.__config__ import DEBUG
 from midiexplorer.gui.helpers.callbacks.debugging import enable as enable_dpg_cb_debugging
-from midiexplorer.gui.windows.hist.data import init_details_table_data, clear_hist_data_table
+from midiexplorer.gui.windows.hist.data import init_details_table_data, clear_hist_data_table, scroll_bar, \
+    scroll_wheel, apply_filter, reset_filter, get_filter_types, FILTER_ANY, export_selection, clear_selection, \
+    init_history
 
 
 def _add_table_columns():
@@ -34,6 +36,8 @@ def create() -> None:
     """Creates the history window.
 
     """
+    init_history()
+
     # -------------------------
     # History window size
     # --------------------------
@@ -56,6 +60,44 @@ def create() -> None:
             collapsed=False,
             pos=[0, hist_win_y]
     ):
+        with dpg.menu_bar():
+            # ------
+            # Filter
+            # ------
+            with dpg.menu(label="Filter"):
+                with dpg.group(horizontal=True):
+                    dpg.add_text("Type:")
+                    dpg.add_combo(tag='hist_filter_type', items=list(get_filter_types().keys()),
+                                  default_value=FILTER_ANY, width=300, callback=apply_filter)
+                with dpg.group(horizontal=True):
+                    dpg.add_text("Channel:")
+                    dpg.add_combo(tag='hist_filter_channel', items=[FILTER_ANY] + [str(c) for c in range(1, 17)],
+                                  default_value=FILTER_ANY, width=60, callback=apply_filter)
+                with dpg.group(horizontal=True):
+                    dpg.add_text("Note/Controller number:")
+                    dpg.add_input_text(tag='hist_filter_number', hint=FILTER_ANY, decimal=True, width=60,
+                                       on_enter=True, callback=apply_filter)
+                with dpg.group(horizontal=True):
+                    dpg.add_text("Source:")
+                    dpg.add_combo(tag='hist_filter_source', items=[FILTER_ANY],
+                                  default_value=FILTER_ANY, width=300, callback=apply_filter)
+                with dpg.group(horizontal=True):
+                    dpg.add_text("Time range (s):")
+                    dpg.add_input_text(tag='hist_filter_start', hint="From", scientific=True, width=100,
+                                       on_enter=True, callback=apply_filter)
+                    dpg.add_input_text(tag='hist_filter_end', hint="To", scientific=True, width=100,
+                                       on_enter=True, callback=apply_filter)
+                dpg.add_button(label="Reset", callback=reset_filter)
+
+            # ---------
+            # Selection
+            # ---------
+            with dpg.menu(label="Selection"):
+                dpg.add_menu_item(label="Export raw", callback=lambda: dpg.show_item('hist_export'))
+                with dpg.tooltip(dpg.last_item()):
+                    dpg.add_text("The history is only kept until the application exits.")
+                dpg.add_menu_item(label="Clear", callback=clear_selection)
+
         # -------------------
         # History data table
         # -------------------
@@ -76,7 +118,14 @@ def create() -> None:
         # TODO: timegraph?
 
         # Content details
-        dpg.add_child_window(parent='hist_table_container', tag='hist_det', label="Details", height=420, border=False)
+        # Only the visible rows exist and are recycled while scrolling through the history
+        with dpg.group(parent='hist_table_container', horizontal=True):
+            dpg.add_child_window(tag='hist_det', label="Details", width=-25, height=420, border=False,
+                                 no_scrollbar=True)
+            dpg.add_slider_int(tag='hist_scrollbar', vertical=True, width=20, height=420,
+                               min_value=0, max_value=0, format="", callback=scroll_bar)
+        with dpg.handler_registry():
+            dpg.add_mouse_wheel_handler(callback=scroll_wheel)
         with dpg.table(parent='hist_det',
                        tag='hist_data_table',
                        header_row=False,  # FIXME: True when table scrolling will be implemented upstream
@@ -94,6 +143,18 @@ def create() -> None:
             dpg.add_checkbox(tag='hist_data_table_autoscroll', label="Auto-Scroll", default_value=True)
             dpg.add_button(label="Clear", callback=clear_hist_data_table)
 
+    with dpg.file_dialog(
+            tag='hist_export',
+            label="Export selected raw MIDI messages",
+            min_size=(640, 480),
+            show=False,
+            modal=True,
+            directory_selector=False,
+            callback=export_selection,
+    ):
+        dpg.add_file_extension('.syx')
+        dpg.add_file_extension('.*')
+
 
 def toggle(sender: int | str, app_data: Any, user_data: Optional[Any]) -> None:
     """Callback to toggle the window visibility.
@@ -6,41 +6,145 @@
 
 """
 History data management.
+
+The history is kept in a columnar store and only its visible window is rendered
+through a fixed pool of recycled table rows.
 """
 
+from array import array
+import functools
+import queue
+from bisect import bisect_left
+from collections import OrderedDict
 from typing import Any, Callable, Optional
 
 import midi_const
-import mido
 from dearpygui import dearpygui as dpg
 
-import midiexplorer.midi.mido2standard
+import midiexplorer.gui.windows.mon.data
 from midiexplorer.__config__ import DEBUG
 from midiexplorer.gui.helpers.callbacks.debugging import \
     enable as enable_dpg_cb_debugging
-from midiexplorer.gui.helpers.constants.slots import Slots
-from midiexplorer.gui.helpers.convert import tooltip_conv
-from midiexplorer.gui.windows.mon import notation_modes
-from midiexplorer.midi.timestamp import Timestamp
+from midiexplorer.gui.helpers.convert import add_tooltip_conv, get_tooltip_conv, set_tooltip_conv
+from midiexplorer.gui.windows.hist.index import get_type, NUMBERED_TYPES
+from midiexplorer.gui.windows.hist.selection import Selection
+from midiexplorer.gui.windows.hist.store import HistoryStore
+from midiexplorer.gui.windows.mon import settings
+from midiexplorer.midi.decoders.message import DecodedMessage, decode as decode_message, NOTE_MESSAGES
+from midiexplorer.midi.timestamp import S2NS, Timestamp
 
 S2MS = 1000  # Seconds to milliseconds ratio
-MAX_SIZE = 180  # Data table struggles with too many elements.
+ROWS = 20  # Number of rendered table rows
+WHEEL_ROWS = 3  # Rows scrolled per mouse wheel step
+FILTER_ANY = "Any"
+MESSAGES_CACHE_SIZE = 1024  # Decoded messages kept for display and selection
+TOOLTIPS_CACHE_SIZE = 256  # Hovered events tooltips contents kept
 
 ###
 # GLOBAL VARIABLES
 #
 # FIXME: global variables should ideally be eliminated as they are a poor programming style
 ###
-hist_data_counter = 0
-selectables = []
+history: HistoryStore | None = None  # Created along with the window
+actions: queue.SimpleQueue = queue.SimpleQueue()  # Requests from the GUI callbacks, run by refresh()
+rows: list[dict[str, Any]] = []  # Recycled table rows widgets
+view_top = 0  # First displayed position
+selection = Selection()
+messages: OrderedDict[int, DecodedMessage] = OrderedDict()  # Least recently used decoded messages by event ID
+dirty = False  # Whether the displayed rows need refreshing
+view: array | None = None  # Filtered event IDs
+view_filter: dict[str, int | None] = {}  # Active filter criteria
+
+
+def get_filter_types() -> dict[str, int | None]:
+    """Message types available for filtering.
+
+    :return: Message types by label.
+
+    """
+    types = {FILTER_ANY: None}
+    for nibble, name in midi_const.CHANNEL_VOICE_MESSAGES.items():
+        types[f"{nibble << 4:02X}: {name}"] = nibble << 4
+    known = set()
+    for messages in (midi_const.SYSTEM_EXCLUSIVE_MESSAGES,
+                     midi_const.SYSTEM_COMMON_MESSAGES,
+                     midi_const.SYSTEM_REAL_TIME_MESSAGES):
+        for status, name in messages.items():
+            if status not in known:
+                known.add(status)
+                types[f"{status:02X}: {name}"] = status
+    return types
+
+
+def init_history() -> None:
+    """Creates the history store.
+
+    Its capture files are temporary and are deleted when the application exits.
+
+    """
+    global history
+
+    history = HistoryStore()
 
 
 def init_details_table_data() -> None:
-    """Initial table data for reverse scrolling.
+    """Creates the recycled table rows.
 
     """
-    with dpg.table_row(parent='hist_data_table', label='hist_data_0'):
-        pass
+    rows.clear()
+    for index in range(ROWS):
+        with dpg.table_row(parent='hist_data_table', show=False) as row:
+            widgets = {'row': row, 'event': None, 'selected': False, 'tooltips_event': None}
+
+            # Source
+            widgets['source'] = dpg.add_selectable(span_columns=True, callback=_selection, user_data=index)
+            with dpg.tooltip(dpg.last_item()):
+                widgets['source_tip'] = dpg.add_text()
+
+            # Destination
+            widgets['destination'] = dpg.add_text()
+
+            # Timestamp (s)
+            widgets['timestamp'] = dpg.add_text()
+            with dpg.tooltip(dpg.last_item()):
+                widgets['timestamp_tip'] = dpg.add_text()
+
+            # Delta (ms)
+            widgets['delta'] = dpg.add_text()
+            with dpg.tooltip(dpg.last_item()):
+                widgets['delta_tip'] = dpg.add_text()
+
+            # Raw message
+            widgets['raw'] = dpg.add_text()
+            widgets['raw_tip'] = add_tooltip_conv()
+
+            # Decoded message
+            if DEBUG:
+                widgets['decoded'] = dpg.add_text()
+                with dpg.tooltip(dpg.last_item()):
+                    widgets['decoded_tip'] = dpg.add_text()
+
+            # Status
+            widgets['status'] = dpg.add_text()
+            widgets['status_tip'] = add_tooltip_conv()
+
+            # Channel
+            widgets['channel'] = dpg.add_text()
+            widgets['channel_tip'] = add_tooltip_conv()
+
+            # Data 1 & 2
+            widgets['data0'] = dpg.add_text()
+            widgets['data0_tip'] = add_tooltip_conv()
+            widgets['data1'] = dpg.add_text()
+            widgets['data1_tip'] = add_tooltip_conv()
+
+        # Tooltips are filled on demand
+        with dpg.item_handler_registry() as handlers:
+            dpg.add_item_hover_handler(callback=_hover, user_data=index)
+        for name in ('source', 'timestamp', 'delta', 'raw', 'decoded', 'status', 'channel', 'data0', 'data1'):
+            if name in widgets:
+                dpg.bind_item_handler_registry(widgets[name], handlers)
+        rows.append(widgets)
 
 
 def clear_hist_data_table(
@@ -55,135 +159,492 @@ def clear_hist_data_table(
     :param user_data: argument is Optionally used to pass your own python data into the function.
 
     """
-    global selectables, hist_data_counter
-
     if DEBUG:
         enable_dpg_cb_debugging(sender, app_data, user_data)
 
-    selectables.clear()
-    hist_data_counter = 0
+    actions.put(_clear)
+
 
-    dpg.delete_item('hist_data_table', children_only=True, slot=Slots.MOST)
-    init_details_table_data()
+def _clear() -> None:
+    """Empties the history.
 
+    Runs on the main thread since the capture file is recreated.
 
-def add(data: mido.Message, source: str, destination: str, timestamp: Timestamp, delta=None) -> None:
+    """
+    global view_top, dirty
+
+    history.clear()
+    if view is not None:
+        del view[:]
+    view_top = 0
+    selection.clear()
+    messages.clear()
+    _get_tooltips.cache_clear()
+    for widgets in rows:
+        widgets['event'] = None
+        widgets['tooltips_event'] = None
+        dpg.hide_item(widgets['row'])
+    dirty = True
+
+
+def add(data: DecodedMessage, source: str, destination: str, timestamp: Timestamp, delta=None) -> None:
     """Adds data to the history table.
 
-    :param data: Midi message
+    :param data: Decoded MIDI message
     :param source: Source name
     :param destination: Destination name
     :param timestamp: Message data timestamp
-    :param delta: Time delta since previous message in seconds
+    :param delta: Time delta since previous message in seconds. Defaults to the timestamp's own.
 
     """
-    global hist_data_counter, selectables
+    global dirty
+
+    if delta is not None:
+        timestamp = Timestamp(timestamp.ns, round(delta * S2NS))
 
     # TODO: insert new data at the top of the table
-    previous_data = hist_data_counter
-
-    # Flush data after a certain amount to avoid memory leak issues
-    # TODO: add setting
-    if hist_data_counter >= MAX_SIZE:
-        # TODO: serialize chunk somewhere to allow unlimited scrolling when implemented
-        clear_hist_data_table()
-
-    hist_data_counter += 1
-
-    chan_val, data0_name, data0_val, data0_dec, data1_name, data1_val, data1_dec = decode(data)
-
-    if delta is None:
-        delta = timestamp.delta
-
-    with dpg.table_row(parent='hist_data_table', label=f'hist_data_{hist_data_counter}',
-                       before=f'hist_data_{previous_data}'):
-
-        # Source
-        target = f'selectable_{hist_data_counter}'
-        dpg.add_selectable(label=source, span_columns=True, tag=target)
-        selectables.append(target)
-        dpg.configure_item(target, callback=_selection, user_data=selectables)
-        with dpg.tooltip(dpg.last_item()):
-            dpg.add_text(source)
-
-        # Destination
-        dpg.add_text(destination)
-
-        # Timestamp (s)
-        dpg.add_text(f"{timestamp.value:n}")
-        with dpg.tooltip(dpg.last_item()):
-            dpg.add_text(f"{timestamp.value}")
-
-        # Delta (ms)
-        dpg.add_text(f"{delta * S2MS:n}")
-        with dpg.tooltip(dpg.last_item()):
-            dpg.add_text(f"{delta * S2MS}")
-
-        # Raw message
-        raw_label = data.hex()
-        dpg.add_text(raw_label)
-        tooltip_conv(raw_label, data.bin())
-
-        # Decoded message
-        if DEBUG:
-            dec_label = repr(data)
-            dpg.add_text(dec_label)
-            with dpg.tooltip(dpg.last_item()):
-                dpg.add_text(dec_label)
-
-        # Status
-        status_byte = midiexplorer.midi.mido2standard.get_status_by_type(
-            data.type
-            )
-        stat_label = midi_const.STATUS_BYTES[status_byte]
-        dpg.add_text(stat_label)
-        if hasattr(data, 'channel'):
-            status_nibble = int((status_byte - data.channel) / 16)
-            tooltip_conv(stat_label, status_nibble, hlen=1, dlen=2, blen=4)
-        else:
-            tooltip_conv(stat_label, status_byte)
+    event = history.append(timestamp, source, destination, data.raw)
+    _cache_message(event, data)
+    if view is not None and _matches(event):
+        view.append(event)
 
-        # Channel
-        chan_label = "Global"
-        if chan_val is not None:
-            chan_label = chan_val + 1  # Human-readable format
-        dpg.add_text(chan_label)
-        tooltip_conv(chan_label, chan_val, hlen=1, dlen=2, blen=4)
+    dirty = True
 
-        # Helper function equivalent to str() but avoids displaying 'None'.
-        xstr: Callable[[Any], str] = lambda s: '' if s is None else str(s)
 
-        if data0_dec:
-            dpg.add_text(str(data0_dec))
-        else:
-            dpg.add_text(xstr(data0_val))
-        prefix0 = ""
-        if data0_name:
-            prefix0 = data0_name + ": "
-        tooltip_conv(prefix0 + xstr(data0_dec if data0_dec else data0_val), data0_val, blen=7)
-
-        dpg.add_text(xstr(data1_val))
-        prefix1 = ""
-        if data1_name:
-            prefix1 = data1_name + ": "
-        tooltip_conv(prefix1 + xstr(data1_dec if data1_dec else data1_val), data1_val, blen=7)
+def _cache_message(event: int, message: DecodedMessage) -> None:
+    """Keeps a decoded message for later use.
+
+    :param event: Event ID.
+    :param message: Decoded message.
+
+    """
+    messages[event] = message
+    if len(messages) > MESSAGES_CACHE_SIZE:
+        messages.popitem(last=False)
+
+
+def get_message(event: int) -> DecodedMessage:
+    """Retrieves an event decoded message.
+
+    Recently added or displayed events are served from the cache.
+    Others are decoded from the stored raw message.
+
+    :param event: Event ID.
+    :return: Decoded message.
+
+    """
+    try:
+        messages.move_to_end(event)
+        return messages[event]
+    except KeyError:
+        message = decode_message(history.raw(event))
+        _cache_message(event, message)
+        return message
+
+
+def _matches(event: int) -> bool:
+    """Checks a newly added event against the active filter.
+
+    :param event: Event ID. Must still be held in memory.
+    :return: Whether the event passes the filter.
+
+    """
+    index = event - history.base
+    status = history.statuses[index]
+    criteria = view_filter
+    if criteria['message_type'] is not None and get_type(status) != criteria['message_type']:
+        return False
+    if criteria['channel'] is not None and history.channels[index] != criteria['channel']:
+        return False
+    if criteria['number'] is not None and (get_type(status) not in NUMBERED_TYPES
+                                           or history.data1[index] != criteria['number']):
+        return False
+    if criteria['source'] is not None and history.source(event) != criteria['source']:
+        return False
+    if criteria['start'] is not None and history.timestamps[index] < criteria['start']:
+        return False
+    if criteria['end'] is not None and history.timestamps[index] > criteria['end']:
+        return False
+    return True
+
+
+def _parse_filter_value(tag: str, scale: int = 1) -> int | None:
+    """Reads a numerical filter widget.
+
+    :param tag: Filter widget tag.
+    :param scale: Factor to apply to the value.
+    :return: The value or None if unset or invalid.
+
+    """
+    try:
+        return round(float(dpg.get_value(tag)) * scale)
+    except ValueError:
+        return None
+
+
+def apply_filter(sender: int | str, app_data: Any, user_data: Optional[Any]) -> None:
+    """Filters the history according to the filter widgets.
+
+    :param sender: argument is used by DPG to inform the callback
+                   which item triggered the callback by sending the tag
+                   or 0 if trigger by the application.
+    :param app_data: argument is used DPG to send information to the callback
+                     i.e. the current value of most basic widgets.
+    :param user_data: argument is Optionally used to pass your own python data into the function.
+
+    """
+    if DEBUG:
+        enable_dpg_cb_debugging(sender, app_data, user_data)
+
+    channel = dpg.get_value('hist_filter_channel')
+    source = dpg.get_value('hist_filter_source')
+    number = _parse_filter_value('hist_filter_number')
+    criteria = {
+        'message_type': get_filter_types().get(dpg.get_value('hist_filter_type')),
+        'channel': None if channel == FILTER_ANY else int(channel) - 1,  # Human-readable format
+        'number': None if number is None or not 0 <= number <= 127 else number,
+        'source': None if source == FILTER_ANY else source,
+        'start': _parse_filter_value('hist_filter_start', S2NS),
+        'end': _parse_filter_value('hist_filter_end', S2NS),
+    }
+    actions.put(functools.partial(_filter, criteria))
+
+
+def _filter(criteria: dict[str, int | str | None]) -> None:
+    """Filters the history.
+
+    Matching events are retrieved from the history index.
+    Runs on the main thread so that no event is added while searching.
+
+    :param criteria: Filter criteria. None values match anything.
+
+    """
+    global view, view_filter
+
+    if all(value is None for value in criteria.values()):
+        view = None
+        view_filter = {}
+    else:
+        view = history.search(**criteria)
+        view_filter = criteria
+    _scroll_to(_max_top())
+
+
+def reset_filter(sender: int | str, app_data: Any, user_data: Optional[Any]) -> None:
+    """Removes the history filter.
+
+    :param sender: argument is used by DPG to inform the callback
+                   which item triggered the callback by sending the tag
+                   or 0 if trigger by the application.
+    :param app_data: argument is used DPG to send information to the callback
+                     i.e. the current value of most basic widgets.
+    :param user_data: argument is Optionally used to pass your own python data into the function.
+
+    """
+    for tag in ('hist_filter_type', 'hist_filter_channel', 'hist_filter_source'):
+        dpg.set_value(tag, FILTER_ANY)
+    for tag in ('hist_filter_number', 'hist_filter_start', 'hist_filter_end'):
+        dpg.set_value(tag, "")
+    apply_filter(sender, app_data, user_data)
+
+
+def _count() -> int:
+    """Number of displayable events.
+
+    :return: Events count.
+
+    """
+    if view is not None:
+        return len(view)
+    return len(history)
+
+
+def _event_at(position: int) -> int:
+    """Event displayed at a position.
+
+    :param position: Position in the displayable events.
+    :return: Event ID.
+
+    """
+    if view is not None:
+        return view[position]
+    return position
+
+
+def _position_of(event: int) -> int:
+    """Position of an event in the displayable events.
+
+    :param event: Event ID.
+    :return: Position of the event or of the next displayable one if filtered out.
+
+    """
+    if view is not None:
+        return bisect_left(view, event)
+    return event
+
+
+def _max_top() -> int:
+    """Last possible first displayed position.
+
+    :return: Position in the displayable events.
+
+    """
+    return max(_count() - ROWS, 0)
+
+
+def _scroll_to(top: int) -> None:
+    """Scrolls the history view.
+
+    Auto-scroll follows whether the view reaches the end of the history.
+
+    :param top: First event to display.
+
+    """
+    global view_top, dirty
+
+    max_top = _max_top()
+    view_top = min(max(top, 0), max_top)
+    dpg.set_value('hist_data_table_autoscroll', view_top == max_top)
+    dirty = True
+
+
+def scroll_bar(sender: int | str, app_data: Any, user_data: Optional[Any]) -> None:
+    """History scrollbar callback.
+
+    :param sender: argument is used by DPG to inform the callback
+                   which item triggered the callback by sending the tag
+                   or 0 if trigger by the application.
+    :param app_data: argument is used DPG to send information to the callback
+                     i.e. the current value of most basic widgets.
+    :param user_data: argument is Optionally used to pass your own python data into the function.
+
+    """
+    # The vertical slider minimum is at the bottom
+    _scroll_to(_max_top() - app_data)
+
+
+def scroll_wheel(sender: int | str, app_data: Any, user_data: Optional[Any]) -> None:
+    """Mouse wheel callback scrolling the history when hovered.
+
+    :param sender: argument is used by DPG to inform the callback
+                   which item triggered the callback by sending the tag
+                   or 0 if trigger by the application.
+    :param app_data: argument is used DPG to send information to the callback
+                     i.e. the current value of most basic widgets.
+    :param user_data: argument is Optionally used to pass your own python data into the function.
+
+    """
+    if dpg.is_item_hovered('hist_det'):
+        _scroll_to(view_top - app_data * WHEEL_ROWS)
+
+
+def refresh() -> None:
+    """Renders the visible window of the history if it changed.
+
+    Called once per frame.
+    Runs the requests from the GUI callbacks first
+    so the history is only ever modified from the main thread.
+
+    """
+    global view_top, dirty
+
+    while not actions.empty():
+        actions.get_nowait()()
+
+    if not dirty:
+        return
+    dirty = False
+
+    if len(history.names) != len(dpg.get_item_configuration('hist_filter_source')['items']) - 1:
+        dpg.configure_item('hist_filter_source', items=[FILTER_ANY] + history.names)
+
+    count = _count()
+    max_top = _max_top()
+    if dpg.get_value('hist_data_table_autoscroll'):
+        view_top = max_top
+    view_top = min(view_top, max_top)
+    dpg.configure_item('hist_scrollbar', max_value=max_top)
+    dpg.set_value('hist_scrollbar', max_top - view_top)
+
+    for index, widgets in enumerate(rows):
+        position = view_top + index
+        if position >= count:
+            if widgets['event'] is not None:
+                widgets['event'] = None
+                dpg.hide_item(widgets['row'])
+            continue
+        event = _event_at(position)
+        if widgets['event'] != event:
+            if widgets['event'] is None:
+                dpg.show_item(widgets['row'])
+            widgets['event'] = event
+            _render_row(widgets, event)
+    _update_selected_rows()
+
+
+def _update_selected_rows() -> None:
+    """Reflects the selection on the displayed rows.
+
+    Only the rows whose state changed are updated.
+
+    """
+    for widgets in rows:
+        state = widgets['event'] is not None and widgets['event'] in selection
+        if widgets['selected'] != state:
+            widgets['selected'] = state
+            dpg.set_value(widgets['source'], state)
+
+
+def _render_row(widgets: dict[str, Any], event: int) -> None:
+    """Displays an event in a recycled table row.
+
+    Tooltips are only filled once hovered.
+
+    :param widgets: Table row widgets.
+    :param event: Event ID.
+
+    """
+    data = get_message(event)
+    timestamp = history.timestamp(event)
+
+    chan_val, data0_val, data0_dec, data1_val = decode(data)
+
+    # Source
+    dpg.set_item_label(widgets['source'], history.source(event))
+
+    # Destination
+    dpg.set_value(widgets['destination'], history.destination(event))
+
+    # Timestamp (s)
+    dpg.set_value(widgets['timestamp'], f"{timestamp.value:n}")
+
+    # Delta (ms)
+    dpg.set_value(widgets['delta'], f"{timestamp.delta * S2MS:n}")
+
+    # Raw message
+    dpg.set_value(widgets['raw'], data.hex())
+
+    # Decoded message
+    if DEBUG:
+        dpg.set_value(widgets['decoded'], repr(data))
+
+    # Status
+    dpg.set_value(widgets['status'], midi_const.STATUS_BYTES[data.kind])
+
+    # Channel
+    chan_label = "Global"
+    if chan_val is not None:
+        chan_label = chan_val + 1  # Human-readable format
+    dpg.set_value(widgets['channel'], chan_label)
+
+    # Helper function equivalent to str() but avoids displaying 'None'.
+    xstr: Callable[[Any], str] = lambda s: '' if s is None else str(s)
+
+    if data0_dec:
+        dpg.set_value(widgets['data0'], str(data0_dec))
+    else:
+        dpg.set_value(widgets['data0'], xstr(data0_val))
+
+    dpg.set_value(widgets['data1'], xstr(data1_val))
 
     # TODO: per message type color coding
     # dpg.highlight_table_row(table_id, i, [255, 0, 0, 100])
 
-    # Autoscroll
-    if dpg.get_value('hist_data_table_autoscroll'):
-        dpg.set_y_scroll('hist_det', -1.0)
 
-    # Single selection
-    # FIXME: add a data structure tracking selected items to only deselect the one(s)
-    for item in selectables:
-        dpg.set_value(item, False)  # Deselect all items upon receiving new data
+def update_notation() -> None:
+    """Refreshes the displayed notes names after a notation change.
+
+    """
+    global dirty
+
+    _get_tooltips.cache_clear()
+    for widgets in rows:
+        widgets['tooltips_event'] = None
+    dirty = True
+
+
+@functools.lru_cache(maxsize=TOOLTIPS_CACHE_SIZE)
+def _get_tooltips(event: int) -> dict[str, Any]:
+    """Computes an event tooltips contents.
+
+    :param event: Event ID.
+    :return: Tooltips texts by widget name.
+
+    """
+    data = get_message(event)
+    timestamp = history.timestamp(event)
+
+    chan_val, data0_val, data0_dec, data1_val = decode(data)
+
+    tooltips = {
+        'source_tip': history.source(event),
+        'timestamp_tip': f"{timestamp.value}",
+        'delta_tip': f"{timestamp.delta * S2MS}",
+    }
+
+    raw_label = data.hex()
+    tooltips['raw_tip'] = get_tooltip_conv(raw_label, data.raw)
+
+    if DEBUG:
+        tooltips['decoded_tip'] = repr(data)
+
+    stat_label = midi_const.STATUS_BYTES[data.kind]
+    if data.channel is not None:
+        tooltips['status_tip'] = get_tooltip_conv(stat_label, data.kind >> 4, hlen=1, dlen=2, blen=4)
+    else:
+        tooltips['status_tip'] = get_tooltip_conv(stat_label, data.kind)
+
+    chan_label = "Global"
+    if chan_val is not None:
+        chan_label = chan_val + 1  # Human-readable format
+    tooltips['channel_tip'] = get_tooltip_conv(chan_label, chan_val, hlen=1, dlen=2, blen=4)
+
+    # Helper function equivalent to str() but avoids displaying 'None'.
+    xstr: Callable[[Any], str] = lambda s: '' if s is None else str(s)
+
+    prefix0 = ""
+    if data.data0_name:
+        prefix0 = data.data0_name + ": "
+    tooltips['data0_tip'] = get_tooltip_conv(prefix0 + xstr(data0_dec if data0_dec else data0_val), data0_val, blen=7)
+
+    prefix1 = ""
+    if data.data1_name:
+        prefix1 = data.data1_name + ": "
+    tooltips['data1_tip'] = get_tooltip_conv(prefix1 + xstr(data1_val), data1_val, blen=7)
+
+    return tooltips
+
+
+def _hover(sender: int | str, app_data: Any, user_data: Optional[Any]) -> None:
+    """Fills a history row tooltips when hovered.
+
+    :param sender: argument is used by DPG to inform the callback
+                   which item triggered the callback by sending the tag
+                   or 0 if trigger by the application.
+    :param app_data: argument is used DPG to send information to the callback
+                     i.e. the current value of most basic widgets.
+    :param user_data: argument is Optionally used to pass your own python data into the function.
+
+    """
+    widgets = rows[user_data]
+    event = widgets['event']
+    if event is None or widgets['tooltips_event'] == event:
+        return
+    widgets['tooltips_event'] = event
+
+    for name, contents in _get_tooltips(event).items():
+        if isinstance(contents, str):
+            dpg.set_value(widgets[name], contents)
+        else:
+            set_tooltip_conv(widgets[name], *contents)
 
 
 def _selection(sender, app_data, user_data):
     """History row selection management.
 
+    A click selects a single event, Ctrl+click toggles an event
+    and Shift+click selects the range of displayable events from the last clicked one.
+
     :param sender: argument is used by DPG to inform the callback
                    which item triggered the callback by sending the tag
                    or 0 if trigger by the application.
@@ -195,80 +656,88 @@ def _selection(sender, app_data, user_data):
     if DEBUG:
         enable_dpg_cb_debugging(sender, app_data, user_data)
 
-    # FIXME: add a data structure tracking selected items to only deselect the one(s)
-    for item in user_data:
-        if item != sender:
-            dpg.set_value(item, False)
+    widgets = rows[user_data]
+    event = widgets['event']
+    # DPG already toggled the selectable
+    widgets['selected'] = app_data
+    if event is None:
+        return
+
+    actions.put(functools.partial(_select, event, app_data,
+                                  dpg.is_key_down(dpg.mvKey_Control), dpg.is_key_down(dpg.mvKey_Shift)))
 
-    raw_message = dpg.get_value(
-        dpg.get_item_children(
-            dpg.get_item_parent(sender),
-            slot=Slots.MOST
-        )[7]
-    )
-    message = mido.Message.from_hex(raw_message)
-    midiexplorer.gui.windows.mon.data.update_gui_monitor(message, static=True)
 
+def _select(event: int, selected: bool, ctrl: bool, shift: bool) -> None:
+    """Updates the selection after a click on an event.
 
-def decode(data: mido.Message) -> tuple[int, int, int, int, int, int, int]:
-    """Decodes the data.
+    Runs on the main thread since the monitor then displays the selected event.
 
-    :param data: MIDI data.
-    :return: Channel value, data 1 & 2 names, values and decoded.
+    :param event: Clicked event ID.
+    :param selected: Whether the clicked row is now selected.
+    :param ctrl: Whether Ctrl was held down.
+    :param shift: Whether Shift was held down.
 
     """
-    # Channel
-    chan_val = None
-    if hasattr(data, 'channel'):
-        chan_val = data.channel
-
-    # Data 1 & 2
-    data0_name: str | False = False
-    data0_val: int | tuple | None = None
-    data0_dec: str | False = False
-    data1_name: str | False = False
-    data1_val: int | None = None
-    data1_dec: str | False = False
-    if 'note' in data.type:
-        data0_name = "Note"
-        data0_val: int = data.note
-        data0_dec = notation_modes.get(dpg.get_value('notation_mode')).get(data.note)
-        data1_name = "Velocity"
-        data1_val: int = data.velocity
-    elif 'polytouch' == data.type:
-        data0_name = "Note"
-        data0_val: int = data.note
-        data0_dec = notation_modes.get(dpg.get_value('notation_mode')).get(data.note)
-        data1_val: int = data.value
-    elif 'control_change' == data.type:
-        data0_name = "Controller"
-        data0_val: int = data.control
-        data0_dec = midi_const.CONTROLLER_NUMBERS.get(data.control)
-        data1_name = "Value"
-        data1_val: int = data.value
-    elif 'program_change' == data.type:
-        data0_name = "Program"
-        data0_val: int = data.program
-        # TODO: Optionally decode General MIDI names.
-    elif 'aftertouch' == data.type:
-        data0_name = "Value"
-        data0_val: int = data.value
-    elif 'pitchwheel' == data.type:
-        data0_name = "Pitch"
-        data0_val: int = data.pitch
-    elif 'sysex' == data.type:
-        data0_name = "Data"
-        data0_val: tuple = data.data
-    elif 'quarter_frame' == data.type:
-        data0_name = "Frame type"
-        data0_val = data.frame_type  # TODO: decode
-        data1_name = "Frame value"
-        data1_val = data.frame_value  # TODO: decode
-    elif 'songpos' == data.type:
-        data0_name = "Position Pointer"
-        data0_val = data.pos
-    elif 'song_select' == data.type:
-        data0_name = "Song #"
-        data0_val = data.song
-
-    return chan_val, data0_name, data0_val, data0_dec, data1_name, data1_val, data1_dec
+    if shift and selection.anchor is not None:
+        first, last = sorted((_position_of(selection.anchor), _position_of(event)))
+        if view is not None:
+            selection.extend(view[first:last + 1], add=ctrl)
+        else:
+            selection.extend(range(first, last + 1), add=ctrl)
+    elif ctrl:
+        selection.toggle(event)
+    elif selected or len(selection) > 1:
+        selection.select(event)
+    else:
+        selection.clear()
+    _update_selected_rows()
+
+    if event in selection:
+        midiexplorer.gui.windows.mon.data.update_gui_monitor(get_message(event), static=True)
+
+
+def clear_selection(sender: int | str, app_data: Any, user_data: Optional[Any]) -> None:
+    """Deselects all the history events.
+
+    :param sender: argument is used by DPG to inform the callback
+                   which item triggered the callback by sending the tag
+                   or 0 if trigger by the application.
+    :param app_data: argument is used DPG to send information to the callback
+                     i.e. the current value of most basic widgets.
+    :param user_data: argument is Optionally used to pass your own python data into the function.
+
+    """
+    if DEBUG:
+        enable_dpg_cb_debugging(sender, app_data, user_data)
+
+    selection.clear()
+    _update_selected_rows()
+
+
+def export_selection(_, app_data) -> None:
+    """Saves the selected events raw MIDI messages to the selected file.
+
+    :param _: Sender is ignored
+    :param app_data: Selected file metadata
+
+    """
+    with open(app_data['file_path_name'], 'wb') as file:
+        for event in selection:
+            file.write(history.raw(event))
+
+
+def decode(data: DecodedMessage) -> tuple[int | None, int | tuple | None, str | None, int | None]:
+    """Decodes the data for display.
+
+    :param data: Decoded MIDI message.
+    :return: Channel value, data 1 value and decoded, data 2 value.
+
+    """
+    data0 = data.data0
+    data0_dec = data.data0_dec
+    if data.kind in NOTE_MESSAGES:
+        data0_dec = settings.notation[data0]
+    elif isinstance(data0, memoryview):
+        data0 = tuple(data0)  # SysEx payload view
+
+    return data.channel, data0, data0_dec, data.data1
@@ -0,0 +1,160 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+History search index.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Callable
+
+NUMBERED_TYPES = {0x80, 0x90, 0xA0, 0xB0}  # Messages whose first data byte is a note or controller number
+
+
+def get_type(status: int) -> int:
+    """Message type of a status byte.
+
+    :param status: Status byte.
+    :return: Status high nibble for channel messages or the full byte for system messages.
+
+    """
+    if status < 0xF0:
+        return status & 0xF0
+    return status
+
+
+def _contains(postings: array, event: int) -> bool:
+    """Checks for an event in a sorted posting list.
+
+    :param postings: Posting list.
+    :param event: Event ID.
+    :return: Whether the event is listed.
+
+    """
+    position = bisect_left(postings, event)
+    return position < len(postings) and postings[position] == event
+
+
+class HistoryIndex:
+    """Posting lists of event IDs per message type, channel, note/controller number and source.
+
+    Lists are maintained incrementally as events are appended and are therefore sorted.
+    They cover every event of the capture, including those released from memory.
+
+    Events aren't necessarily appended in chronological order since ports are drained in turns.
+    The time range is resolved by bisecting the latest timestamp seen at each event instead.
+    Only the events within the maximum observed lateness of the range bounds are then checked.
+
+    """
+
+    def __init__(self) -> None:
+        self.types: dict[int, array] = {}
+        self.channels: dict[int, array] = {}
+        self.numbers: dict[int, array] = {}
+        self.sources: dict[int, array] = {}
+        self.latest = array('q')  # Latest timestamp up to each event (nanoseconds). Sorted.
+        self.lateness = 0  # Maximum delay of an event behind the latest timestamp (nanoseconds)
+
+    @staticmethod
+    def _post(postings: dict[int, array], key: int, event: int) -> None:
+        """Appends an event to a posting list.
+
+        :param postings: Posting lists.
+        :param key: Posting list key.
+        :param event: Event ID.
+
+        """
+        try:
+            postings[key].append(event)
+        except KeyError:
+            postings[key] = array('Q', [event])
+
+    def add(self, event: int, timestamp: int, status: int, data1: int, source: int) -> None:
+        """Indexes an event.
+
+        :param event: Event ID.
+        :param timestamp: Event timestamp (nanoseconds).
+        :param status: Status byte.
+        :param data1: First data byte.
+        :param source: Source ID.
+
+        """
+        message_type = get_type(status)
+        self._post(self.types, message_type, event)
+        if status < 0xF0:
+            self._post(self.channels, status & 0x0F, event)
+            if message_type in NUMBERED_TYPES:
+                self._post(self.numbers, data1, event)
+        self._post(self.sources, source, event)
+
+        if self.latest and timestamp < self.latest[-1]:
+            self.lateness = max(self.lateness, self.latest[-1] - timestamp)
+            timestamp = self.latest[-1]
+        self.latest.append(timestamp)
+
+    def _time_ranges(self, start: int | None, end: int | None) -> tuple[tuple[int, int, bool], ...]:
+        """Narrows a time range to event IDs ranges.
+
+        :param start: Earliest timestamp (nanoseconds).
+        :param end: Latest timestamp (nanoseconds).
+        :return: First and last (excluded) event IDs and whether their timestamps need checking.
+
+        """
+        latest = self.latest
+        low = certain_low = 0
+        certain_high = high = len(latest)
+        if start is not None:
+            low = bisect_left(latest, start)
+            certain_low = bisect_left(latest, start + self.lateness, lo=low)
+        if end is not None:
+            certain_high = bisect_right(latest, end, lo=certain_low)
+            high = bisect_right(latest, end + self.lateness, lo=certain_high)
+        return (low, certain_low, True), (certain_low, certain_high, False), (certain_high, high, True)
+
+    def search(self, timestamp_of: Callable[[int], int],
+               message_type: int | None = None, channel: int | None = None, number: int | None = None,
+               source: int | None = None, start: int | None = None, end: int | None = None) -> array:
+        """Finds the events matching all the given criteria.
+
+        The shortest posting list is walked and checked against the others by bisection.
+
+        :param timestamp_of: Retrieves an event timestamp (nanoseconds).
+        :param message_type: Message type as returned by get_type().
+        :param channel: Channel number.
+        :param number: Note or controller number.
+        :param source: Source ID.
+        :param start: Earliest timestamp (nanoseconds).
+        :param end: Latest timestamp (nanoseconds).
+        :return: Matching event IDs.
+
+        """
+        matches = array('Q')
+        lists = []
+        for postings, key in ((self.types, message_type), (self.channels, channel),
+                              (self.numbers, number), (self.sources, source)):
+            if key is not None:
+                if key not in postings:
+                    return matches
+                lists.append(postings[key])
+        lists.sort(key=len)
+
+        earliest = float('-inf') if start is None else start
+        last = float('inf') if end is None else end
+        for low, high, check in self._time_ranges(start, end):
+            if low >= high:
+                continue
+            if not lists:
+                candidates = range(low, high)
+            else:
+                shortest, others = lists[0], lists[1:]
+                candidates = shortest[bisect_left(shortest, low):bisect_left(shortest, high)]
+                if others:
+                    candidates = (event for event in candidates
+                                  if all(_contains(postings, event) for postings in others))
+            if check:
+                candidates = (event for event in candidates if earliest <= timestamp_of(event) <= last)
+            matches.extend(candidates)
+        return matches
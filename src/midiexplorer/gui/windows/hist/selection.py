@@ -0,0 +1,75 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+History selection model.
+"""
+from typing import Iterable, Iterator
+
+
+class Selection:
+    """Selected history events.
+
+    Events are tracked by ID so the selection is independent of the displayed rows
+    and survives scrolling, filtering and incoming data.
+
+    """
+
+    def __init__(self) -> None:
+        self.events: set[int] = set()
+        self.anchor: int | None = None  # Last clicked event, start of range selections
+
+    def __contains__(self, event: int) -> bool:
+        return event in self.events
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterates over the selected events in chronological order.
+
+        """
+        return iter(sorted(self.events))
+
+    def clear(self) -> None:
+        """Deselects all events.
+
+        """
+        self.events.clear()
+        self.anchor = None
+
+    def select(self, event: int) -> None:
+        """Selects a single event.
+
+        :param event: Event ID.
+
+        """
+        self.events.clear()
+        self.events.add(event)
+        self.anchor = event
+
+    def toggle(self, event: int) -> None:
+        """Adds or removes an event from the selection.
+
+        :param event: Event ID.
+
+        """
+        if event in self.events:
+            self.events.remove(event)
+        else:
+            self.events.add(event)
+        self.anchor = event
+
+    def extend(self, events: Iterable[int], add: bool = False) -> None:
+        """Selects a range of events, keeping the anchor.
+
+        :param events: Event IDs.
+        :param add: Whether to add to the current selection instead of replacing it.
+
+        """
+        if not add:
+            self.events.clear()
+        self.events.update(events)
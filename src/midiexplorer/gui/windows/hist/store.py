@@ -0,0 +1,223 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+History columnar event store.
+"""
+from array import array
+
+from midiexplorer.gui.windows.hist.index import HistoryIndex
+from midiexplorer.midi.capture import CaptureFile
+from midiexplorer.midi.timestamp import Timestamp
+
+NONE = -1  # Absent channel or data byte
+MEMORY_SIZE = 100_000  # Most recent events kept in memory
+SPILL_SIZE = 10_000  # Events released from memory at once
+
+
+class HistoryStore:
+    """Unbounded history of MIDI events.
+
+    Every event is appended to a memory-mapped temporary capture file.
+    The history therefore doesn't persist once the application exits.
+    The most recent ones are also kept in array-backed columns instead of Python objects.
+    Older events are released from memory and read back from the capture file on demand.
+    Each event is identified by its index in the store.
+    Events are indexed as they are appended to allow fast searches.
+
+    """
+
+    def __init__(self) -> None:
+        self._capture = CaptureFile()
+        self.index = HistoryIndex()
+        self.base = 0  # First event kept in memory. Columns are indexed relatively to it.
+        self.timestamps = array('q')  # Nanoseconds
+        self.deltas = array('q')  # Nanoseconds
+        self.sources = array('H')  # Name IDs
+        self.destinations = array('H')  # Name IDs
+        self.statuses = array('B')
+        self.channels = array('b')
+        self.data1 = array('b')
+        self.data2 = array('b')
+        # Raw messages are packed in a single buffer indexed by offsets
+        self._offsets = array('Q', [0])
+        self._raw = bytearray()
+        self._raw_base = 0  # Offset of the first byte kept in memory
+        self._names: list[str] = []
+        self._name_ids: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return self.base + len(self.statuses)
+
+    def clear(self) -> None:
+        """Removes all events.
+
+        """
+        self._capture.close()
+        self.__init__()
+
+    @property
+    def names(self) -> list[str]:
+        """Known source and destination names.
+
+        :return: Names by ID.
+
+        """
+        return self._names
+
+    def name_id(self, name: str) -> int | None:
+        """Looks up a source or destination name.
+
+        :param name: Port or module name.
+        :return: Name ID if known.
+
+        """
+        return self._name_ids.get(name)
+
+    def _name_id(self, name: str) -> int:
+        """Interns a source or destination name.
+
+        :param name: Port or module name.
+        :return: Name ID.
+
+        """
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = len(self._names)
+            self._names.append(name)
+            self._name_ids[name] = name_id
+        return name_id
+
+    def append(self, timestamp: Timestamp, source: str, destination: str, data: bytes) -> int:
+        """Stores an event.
+
+        :param timestamp: Event timestamp.
+        :param source: Source name.
+        :param destination: Destination name.
+        :param data: Raw MIDI message.
+        :return: Event ID.
+
+        """
+        if len(self.statuses) >= MEMORY_SIZE:
+            self._spill()
+
+        source_id = self._name_id(source)
+        destination_id = self._name_id(destination)
+        event = self._capture.append(timestamp.ns, timestamp.delta_ns, source_id, destination_id, data)
+
+        status = data[0]
+        length = len(data)
+        self.timestamps.append(timestamp.ns)
+        self.deltas.append(timestamp.delta_ns)
+        self.sources.append(source_id)
+        self.destinations.append(destination_id)
+        self.statuses.append(status)
+        if status < 0xF0:
+            self.channels.append(status & 0x0F)
+        else:
+            self.channels.append(NONE)
+        if status == 0xF0:  # System exclusive payload is only available raw
+            length = 1
+        data1 = data[1] if length > 1 else NONE
+        self.data1.append(data1)
+        self.data2.append(data[2] if length > 2 else NONE)
+        self._raw += data
+        self._offsets.append(self._raw_base + len(self._raw))
+        self.index.add(event, timestamp.ns, status, data1, source_id)
+        return event
+
+    def _spill(self) -> None:
+        """Releases the oldest events from memory.
+
+        They remain available from the capture file.
+
+        """
+        for column in (self.timestamps, self.deltas, self.sources, self.destinations,
+                       self.statuses, self.channels, self.data1, self.data2):
+            del column[:SPILL_SIZE]
+        cut = self._offsets[SPILL_SIZE]
+        del self._raw[:cut - self._raw_base]
+        del self._offsets[:SPILL_SIZE]
+        self._raw_base = cut
+        self.base += SPILL_SIZE
+
+    def search(self, message_type: int | None = None, channel: int | None = None, number: int | None = None,
+               source: str | None = None, start: int | None = None, end: int | None = None) -> array:
+        """Finds the events matching all the given criteria.
+
+        :param message_type: Message type as returned by index.get_type().
+        :param channel: Channel number.
+        :param number: Note or controller number.
+        :param source: Source name.
+        :param start: Earliest timestamp (nanoseconds).
+        :param end: Latest timestamp (nanoseconds).
+        :return: Matching event IDs.
+
+        """
+        source_id = None
+        if source is not None:
+            source_id = self.name_id(source)
+            if source_id is None:
+                return array('Q')
+        return self.index.search(self.timestamp_ns, message_type, channel, number, source_id, start, end)
+
+    def timestamp_ns(self, event: int) -> int:
+        """Retrieves an event timestamp value.
+
+        :param event: Event ID.
+        :return: Nanoseconds.
+
+        """
+        if event < self.base:
+            return self._capture.record(event)[0]
+        return self.timestamps[event - self.base]
+
+    def timestamp(self, event: int) -> Timestamp:
+        """Retrieves an event timestamp.
+
+        :param event: Event ID.
+        :return: Event timestamp.
+
+        """
+        if event < self.base:
+            timestamp, delta, _, _, _ = self._capture.record(event)
+            return Timestamp(timestamp, delta)
+        index = event - self.base
+        return Timestamp(self.timestamps[index], self.deltas[index])
+
+    def source(self, event: int) -> str:
+        """Retrieves an event source name.
+
+        :param event: Event ID.
+        :return: Source name.
+
+        """
+        if event < self.base:
+            return self._names[self._capture.record(event)[2]]
+        return self._names[self.sources[event - self.base]]
+
+    def destination(self, event: int) -> str:
+        """Retrieves an event destination name.
+
+        :param event: Event ID.
+        :return: Destination name.
+
+        """
+        if event < self.base:
+            return self._names[self._capture.record(event)[3]]
+        return self._names[self.destinations[event - self.base]]
+
+    def raw(self, event: int) -> bytes:
+        """Retrieves an event raw MIDI message.
+
+        :param event: Event ID.
+        :return: Raw MIDI message.
+
+        """
+        if event < self.base:
+            return self._capture.record(event)[4]
+        index = event - self.base
+        return bytes(self._raw[self._offsets[index] - self._raw_base:self._offsets[index + 1] - self._raw_base])
@@ -13,6 +13,7 @@ from typing import Any, Optional
 import midi_const
 from dearpygui import dearpygui as dpg
 
+import midiexplorer.gui.windows.hist.data
 import midiexplorer.midi.mido2standard
 import midiexplorer.midi.notes
 from midiexplorer.__config__ import DEBUG
@@ -20,8 +21,9 @@ from midiexplorer.gui.helpers.callbacks.debugging import \
     enable as enable_dpg_cb_debugging
 from midiexplorer.gui.helpers.convert import add_string_value_preconv, \
     tooltip_conv, tooltip_preconv
-from midiexplorer.gui.windows.mon.blink import get_supported_indicators
-from midiexplorer.gui.windows.mon.settings import eox_categories, notation_modes
+from midiexplorer.gui.windows.mon.blink import init_items
+from midiexplorer.gui.windows.mon import settings
+from midiexplorer.gui.windows.mon.settings import eox_categories, get_notation, notation_modes
 
 
 def _verticalize(text: str) -> str:
@@ -70,9 +72,49 @@ def _update_notation_mode(sender: int | str, app_data: Any, user_data: Optional[
     if DEBUG:
         enable_dpg_cb_debugging(sender, app_data, user_data)
 
+    settings.notation = get_notation(dpg.get_value('notation_mode'))
+
     # Update keyboard
-    for index in range(0, 128):  # All MIDI notes
-        dpg.set_item_label(f'note_{index}', _verticalize(user_data.get(dpg.get_value('notation_mode')).get(index)))
+    for index, name in enumerate(settings.notation):  # All MIDI notes
+        dpg.set_item_label(f'note_{index}', _verticalize(name))
+
+    # Update history
+    midiexplorer.gui.windows.hist.data.update_notation()
+
+
+def _update_blink_duration(sender: int | str, app_data: Any, user_data: Optional[Any]) -> None:
+    """Changes the monitor indicators persistence.
+
+    :param sender: argument is used by DPG to inform the callback
+                   which item triggered the callback by sending the tag
+                   or 0 if trigger by the application.
+    :param app_data: argument is used DPG to send information to the callback
+                     i.e. the current value of most basic widgets.
+    :param user_data: argument is Optionally used to pass your own python data into the function.
+
+    """
+    if DEBUG:
+        enable_dpg_cb_debugging(sender, app_data, user_data)
+
+    dpg.set_value('mon_blink_duration', app_data)
+    settings.blink_duration = app_data
+
+
+def _update_zero_velocity(sender: int | str, app_data: Any, user_data: Optional[Any]) -> None:
+    """Changes whether zero velocity note on messages are considered note off.
+
+    :param sender: argument is used by DPG to inform the callback
+                   which item triggered the callback by sending the tag
+                   or 0 if trigger by the application.
+    :param app_data: argument is used DPG to send information to the callback
+                     i.e. the current value of most basic widgets.
+    :param user_data: argument is Optionally used to pass your own python data into the function.
+
+    """
+    if DEBUG:
+        enable_dpg_cb_debugging(sender, app_data, user_data)
+
+    settings.zero_velocity_note_on_is_note_off = app_data
 
 
 def create() -> None:
@@ -86,16 +128,12 @@ def create() -> None:
         # ------------
         # Preferences
         # ------------
-        dpg.add_float_value(tag='mon_blink_duration', default_value=.25)  # seconds
+        dpg.add_float_value(tag='mon_blink_duration', default_value=settings.blink_duration)  # seconds
         # Per standard, consider note-on with velocity set to 0 as note-off
-        dpg.add_bool_value(tag='zero_velocity_note_on_is_note_off', default_value=True)
+        dpg.add_bool_value(tag='zero_velocity_note_on_is_note_off',
+                           default_value=settings.zero_velocity_note_on_is_note_off)
         dpg.add_string_value(tag='eox_category', default_value=eox_categories[0])
         dpg.add_string_value(tag='notation_mode', default_value=next(iter(notation_modes.keys())))  # First key
-        # ----------------------------
-        # Indicators blink management
-        # ----------------------------
-        for indicator in get_supported_indicators():
-            dpg.add_float_value(tag=f'{indicator}_active_until', default_value=0)  # seconds
         # ---------------
         # SysEx decoding
         # ---------------
@@ -110,6 +148,7 @@ def create() -> None:
         add_string_value_preconv(tag='syx_sub_id1_val')
         dpg.add_string_value(tag='syx_sub_id2_name')
         add_string_value_preconv(tag='syx_sub_id2_val')
+        dpg.add_string_value(tag='syx_fields')
 
     # ---------------------------------------
     # DEAR PYGUI THEME for activated buttons
@@ -193,13 +232,13 @@ def create() -> None:
                         tag='mon_blink_duration_slider',
                         label="seconds",
                         min_value=1 / 120, max_value=2 / 3, source='mon_blink_duration',  # Min is one frame@120FPS
-                        callback=lambda:
-                        dpg.set_value('mon_blink_duration', dpg.get_value('mon_blink_duration_slider'))
+                        callback=_update_blink_duration
                     )
                 with dpg.group(horizontal=True):
                     dpg.add_text("Zero (0) velocity Note On is Note Off:")
                     dpg.add_checkbox(label="(default, MIDI specification compliant)",
-                                     source='zero_velocity_note_on_is_note_off')
+                                     source='zero_velocity_note_on_is_note_off',
+                                     callback=_update_zero_velocity)
                 with dpg.group(horizontal=True):
                     dpg.add_text("EOX is a:")
                     dpg.add_radio_button(
@@ -525,7 +564,7 @@ def create() -> None:
         bxpos = width / 2  # Black key X position
         wxpos = 0  # White key X position
 
-        for index, name in notation_modes.get(dpg.get_value('notation_mode')).items():
+        for index, name in enumerate(settings.notation):
             # Compute actual key position
             xpos = wxpos
             ypos = height
@@ -662,7 +701,7 @@ def create() -> None:
         # -----------------
         with dpg.collapsing_header(label="System Exclusive", default_open=True):
 
-            with dpg.child_window(tag='mon_sysex_container', height=120, border=False):
+            with dpg.child_window(tag='mon_sysex_container', height=200, border=False):
                 with dpg.group():
                     with dpg.group(horizontal=True):
                         title = "ID"
@@ -703,6 +742,12 @@ def create() -> None:
                 dpg.add_text(title)
                 dpg.add_input_text(source='syx_sub_id2_name', readonly=True, width=250)
                 tooltip_preconv(title, 'syx_sub_id2_name', 'syx_sub_id2_val')
+            with dpg.group(horizontal=True, tag='syx_fields_container'):
+                dpg.add_text("Fields")
+                dpg.add_input_text(source='syx_fields', readonly=True, multiline=True, width=500, height=60)
+
+    # Resolve the widgets used on the hot path
+    init_items()
 
 
 def toggle(sender: int | str, app_data: Any, user_data: Optional[Any]) -> None:
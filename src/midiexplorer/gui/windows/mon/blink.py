@@ -13,8 +13,53 @@ import time
 from dearpygui import dearpygui as dpg
 
 from midiexplorer.__config__ import DEBUG
+from midiexplorer.gui.windows.mon import settings
+from midiexplorer.gui.windows.mon.state import MonitorDelta, MonitorState, STATIC
 from midiexplorer.midi.timestamp import Timestamp
 
+###
+# GLOBAL VARIABLES
+#
+# FIXME: global variables should ideally be eliminated as they are a poor programming style
+###
+state = MonitorState()
+delta = MonitorDelta()  # Pending widget updates, flushed once per frame
+# Widget item IDs built by init_items()
+indicator_items: dict[str, tuple[int, ...]] = {}  # By indicator name
+status_items: tuple[tuple[int, ...], ...] = ()  # By status byte
+channel_items: tuple[tuple[int, ...], ...] = ()  # By channel number
+controller_items: tuple[tuple[int, ...], ...] = ()  # By controller number
+controller_value_items: tuple[int, ...] = ()  # By controller number
+note_items: tuple[int, ...] = ()  # By note number
+
+CHANNEL_INDICATORS = {  # By status high nibble
+    0x8: 'note_off',
+    0x9: 'note_on',
+    0xA: 'polytouch',
+    0xB: 'control_change',
+    0xC: 'program_change',
+    0xD: 'aftertouch',
+    0xE: 'pitchwheel',
+}
+SYSTEM_INDICATORS = {  # By status byte
+    0xF0: 'sysex',
+    0xF1: 'quarter_frame',
+    0xF2: 'songpos',
+    0xF3: 'song_select',
+    0xF4: 'undef1',
+    0xF5: 'undef2',
+    0xF6: 'tune_request',
+    0xF7: 'end_of_exclusive',
+    0xF8: 'clock',
+    0xF9: 'undef3',
+    0xFA: 'start',
+    0xFB: 'continue',
+    0xFC: 'stop',
+    0xFD: 'undef4',
+    0xFE: 'active_sensing',
+    0xFF: 'reset',
+}
+
 
 @functools.lru_cache()  # Only compute once
 def get_supported_indicators() -> list:
@@ -80,6 +125,7 @@ def get_supported_decoders() -> list:
         'syx_sub_id1_val',
         'syx_sub_id2_name',
         'syx_sub_id2_val',
+        'syx_fields',
     ]
     return decoders
 
@@ -94,7 +140,59 @@ def get_theme(static, disable: bool = False):
     return theme
 
 
-def mon(indicator: int | str, static: bool = False) -> None:
+def _item_ids(*tags: str) -> tuple[int, ...]:
+    """Resolves existing widget tags to their numerical item IDs.
+
+    :param tags: Widget tags.
+    :return: Item IDs.
+
+    """
+    return tuple(dpg.get_alias_id(tag) for tag in tags if dpg.does_alias_exist(tag))
+
+
+def init_items() -> None:
+    """Builds the widget item IDs tables used on the hot path.
+
+    Must be called once the monitor window is created.
+
+    """
+    global indicator_items, status_items, channel_items, controller_items, controller_value_items, note_items
+
+    indicator_items = {indicator[len('mon_'):]: _item_ids(indicator) for indicator in get_supported_indicators()}
+    # EOX is a special case since we have two alternate representations.
+    indicator_items['end_of_exclusive'] = _item_ids('mon_end_of_exclusive_common', 'mon_end_of_exclusive_syx')
+
+    status_items = tuple(
+        indicator_items.get(CHANNEL_INDICATORS.get(status >> 4) or SYSTEM_INDICATORS.get(status), ())
+        for status in range(256)
+    )
+    channel_items = tuple(indicator_items[str(channel)] for channel in range(16))
+    controller_items = tuple(indicator_items[f'cc_{controller}'] for controller in range(128))
+    controller_value_items = tuple(dpg.get_alias_id(f'mon_cc_val_{controller}') for controller in range(128))
+    note_items = tuple(dpg.get_alias_id(f'note_{note}') for note in range(128))
+
+
+def _light(items: tuple[int, ...], static: bool) -> None:
+    """Illuminates indicator widgets and prepare metadata for their lifetime management.
+
+    :param items: Indicator item IDs.
+    :param static: Live or static mode.
+
+    """
+    if not static:
+        now = time.perf_counter() - Timestamp.START_TIME
+        until = now + settings.blink_duration
+    else:
+        until = STATIC
+    theme = get_theme(static)
+    for item in items:
+        state.light(item, until)
+        delta.lamps[item] = theme
+    # logger.log_debug(f"Current time:{time.perf_counter() - Timestamp.START_TIME}")
+    # logger.log_debug(f"Blink until: {until}")
+
+
+def mon(indicator: str, static: bool = False) -> None:
     """Illuminates an indicator in the monitor panel and prepare metadata for its lifetime management.
 
     :param indicator: Name of the indicator to blink.
@@ -104,26 +202,30 @@ def mon(indicator: int | str, static: bool = False) -> None:
     # logger = midiexplorer.gui.logger.Logger()
     # logger.log_debug(f"blink {indicator}")
 
-    now = time.perf_counter() - Timestamp.START_TIME
-    delay = dpg.get_value('mon_blink_duration')
-    target = f'mon_{indicator}_active_until'
-    if not static:
-        until = now + delay
-    else:
-        until = float('inf')
-    dpg.set_value(target, until)
-    theme = get_theme(static)
-    # EOX special case since we have two alternate representations.
-    if indicator != 'end_of_exclusive':
-        dpg.bind_item_theme(f'mon_{indicator}', theme)
-    else:
-        dpg.bind_item_theme(f'mon_{indicator}_common', theme)
-        dpg.bind_item_theme(f'mon_{indicator}_syx', theme)
-    # logger.log_debug(f"Current time:{time.perf_counter() - Timestamp.START_TIME}")
-    # logger.log_debug(f"Blink {delay} until: {dpg.get_value(target)}")
+    _light(indicator_items[indicator], static)
+
+
+def status(status_byte: int, static: bool = False) -> None:
+    """Illuminates the message type indicator.
+
+    :param status_byte: MIDI status byte.
+    :param static: Live or static mode.
+
+    """
+    _light(status_items[status_byte], static)
+
+
+def channel(number: int, static: bool = False) -> None:
+    """Illuminates the channel indicator.
+
+    :param number: MIDI channel number.
+    :param static: Live or static mode.
+
+    """
+    _light(channel_items[number], static)
 
 
-def note_on(number: int | str, static: bool = False, velocity: int = None) -> None:
+def note_on(number: int, static: bool = False, velocity: int = None) -> None:
     """Illuminates the note.
 
     :param number: MIDI note number.
@@ -131,64 +233,79 @@ def note_on(number: int | str, static: bool = False, velocity: int = None) -> No
     :param velocity: Note velocity
 
     """
-    theme = get_theme(static)
-    dpg.bind_item_theme(f'note_{number}', theme)
+    item = note_items[number]
+    delta.notes[item] = get_theme(static)
+    state.notes[number] = static
     if velocity is not None:
-        dpg.set_value(f'note_{number}', velocity)
+        delta.values[item] = velocity
 
 
-def note_off(number: int | str, static: bool = False) -> None:
+def note_off(number: int, static: bool = False) -> None:
     """Darken the note.
 
     :param number: MIDI note number.
     :param static: Live or static mode.
 
     """
-    theme = get_theme(static, disable=True)
-    dpg.bind_item_theme(f'note_{number}', theme)
-    dpg.set_value(f'note_{number}', 0)
+    item = note_items[number]
+    delta.notes[item] = get_theme(static, disable=True)
+    delta.values[item] = 0
+    state.notes.pop(number, None)
 
 
-def cc(number: int | str, value: int | str, static: bool = False) -> None:
-    mon(f'cc_{number}', static)
-    dpg.set_value(f'mon_cc_val_{number}', value)
+def cc(number: int, value: int, static: bool = False) -> None:
+    _light(controller_items[number], static)
+    delta.values[controller_value_items[number]] = value
 
 
-def _reset_indicator(indicator):
-    # EOX is a special case since we have two alternate representations.
-    if indicator != 'mon_end_of_exclusive':
-        dpg.bind_item_theme(f'{indicator}', None)
-    else:
-        dpg.bind_item_theme(f'{indicator}_common', None)
-        dpg.bind_item_theme(f'{indicator}_syx', None)
-    dpg.set_value(f'{indicator}_active_until', 0.0)
+def _reset_indicator(item: int) -> None:
+    delta.lamps[item] = None
+
+
+def flush() -> None:
+    """Applies the pending monitor changes to the widgets.
+
+    """
+    if not delta:
+        return
+    for item, theme in delta.lamps.items():
+        dpg.bind_item_theme(item, theme)
+    for item, theme in delta.notes.items():
+        dpg.bind_item_theme(item, theme)
+    for item, value in delta.values.items():
+        dpg.set_value(item, value)
+    delta.clear()
 
 
 def update_mon_status() -> None:
     """Handles monitor indicators blinking status update each frame.
 
-    Checks for the time it should stay illuminated and darkens it if expired.
+    Only the indicators whose illumination time expired are darkened.
+    Pending changes are then applied to the widgets.
 
     """
-    now = time.perf_counter() - Timestamp.START_TIME
-    for indicator in get_supported_indicators():
-        value = dpg.get_value(f'{indicator}_active_until')
-        if value:  # Prevent resetting theme when not needed.
-            if value < now:
-                _reset_indicator(indicator)
+    if state.expiries:
+        for indicator in state.expired(time.perf_counter() - Timestamp.START_TIME):
+            _reset_indicator(indicator)
+    flush()
 
 
 def reset_mon(static: bool = False) -> None:
-    # FIXME: add a data structure caching the currently lit indicators to only process those needed
-    for indicator in get_supported_indicators():
-        if not static or dpg.get_value(f'{indicator}_active_until') == float('inf'):
-            _reset_indicator(indicator)
+    """Darkens the monitor.
 
-    for index in range(0, 128):  # All MIDI notes
-        if not static or dpg.get_item_theme(f'note_{index}') == '__force_act':
-            note_off(index)
+    Only what is currently lit is processed.
 
-    if not static:
+    :param static: Only reset what was lit in static mode.
+
+    """
+    for indicator in state.lit_indicators(static):
+        _reset_indicator(indicator)
+
+    for note in state.lit_notes(static):
+        note_off(note)
+
+    if not static and state.sysex:
+        state.sysex = False
         for decoder in get_supported_decoders():
             dpg.set_value(f'{decoder}', "")
         # SysEx dynamic display
@@ -8,13 +8,15 @@
 Monitor data management.
 """
 
-import mido
 from dearpygui import dearpygui as dpg
 from midi_const import NOTE_OFF_VELOCITY
 
 from midiexplorer.gui.helpers.convert import set_value_preconv
-from midiexplorer.gui.windows.mon.blink import cc, mon, note_off, note_on, \
-    reset_mon
+from midiexplorer.gui.windows.mon import settings
+from midiexplorer.gui.windows.mon.blink import cc, channel, mon, note_off, note_on, \
+    reset_mon, state, status
+from midiexplorer.midi.decoders.message import CONTROL_CHANGE, DecodedMessage, NOTE_OFF, NOTE_ON, POLYTOUCH, \
+    SYSEX
 from midiexplorer.midi.decoders.sysex import DecodedSysEx, \
     DecodedUniversalSysExPayload
 
@@ -24,7 +26,7 @@ def _update_gui_sysex(decoded: DecodedSysEx):
 
     :param decoded: Decoded system exclusive message from _decode_sysex().
     """
-
+    state.sysex = True
     dpg.set_value('syx_id_group', decoded.identifier.group)
     dpg.set_value('syx_id_region', decoded.identifier.region)
     dpg.set_value('syx_id_name', decoded.identifier.name)
@@ -44,17 +46,82 @@ def _update_gui_sysex(decoded: DecodedSysEx):
             set_value_preconv('syx_sub_id2_val', decoded.payload.sub_id2_value if not None else "")
             dpg.show_item('syx_sub_id2')
         else:
-            dpg.hide_item('syx_sub_id2_value')
+            dpg.hide_item('syx_sub_id2')
+        fields = decoded.payload.fields()
+        if fields:
+            dpg.set_value('syx_fields', '\n'.join(f"{name}: {value}" for name, value in fields.items()))
+            dpg.show_item('syx_fields_container')
+        else:
+            dpg.hide_item('syx_fields_container')
         dpg.show_item('syx_decoded_payload')
     else:
         dpg.hide_item('syx_decoded_payload')
         dpg.show_item('syx_payload_container')
 
 
-def update_gui_monitor(data: mido.Message, static: bool = False) -> None:
+def _update_gui_note(message: DecodedMessage, static: bool) -> None:
+    """Updates the keyboard from a note message.
+
+    :param message: Decoded note on or off message.
+    :param static: Live or static mode.
+
+    """
+    zero_velocity = settings.zero_velocity_note_on_is_note_off and message.data1 == NOTE_OFF_VELOCITY
+    if zero_velocity:
+        mon('note_off', static)
+    # Keyboard
+    if message.kind == NOTE_ON and not zero_velocity:
+        note_on(message.data0, static, message.data1)
+    else:
+        note_off(message.data0, static)
+
+
+def _update_gui_polytouch(message: DecodedMessage, static: bool) -> None:
+    """Updates the keyboard from a polyphonic key pressure message.
+
+    :param message: Decoded polytouch message.
+    :param static: Live or static mode.
+
+    """
+    if static:
+        note_on(message.data0, static)
+
+
+def _update_gui_cc(message: DecodedMessage, static: bool) -> None:
+    """Updates the controllers from a control change message.
+
+    :param message: Decoded control change message.
+    :param static: Live or static mode.
+
+    """
+    cc(message.data0, message.data1, static)
+
+
+def _update_gui_sysex_message(message: DecodedMessage, static: bool) -> None:
+    """Updates the system exclusive decoding from a system exclusive message.
+
+    :param message: Decoded system exclusive message.
+    :param static: Live or static mode.
+
+    """
+    _update_gui_sysex(DecodedSysEx(message.data0))
+
+
+# TODO: display program change (Optionally decode General MIDI names), aftertouch, pitchwheel,
+#       quarter frame, song position and song select.
+_HANDLERS = {  # By message kind
+    NOTE_OFF: _update_gui_note,
+    NOTE_ON: _update_gui_note,
+    POLYTOUCH: _update_gui_polytouch,
+    CONTROL_CHANGE: _update_gui_cc,
+    SYSEX: _update_gui_sysex_message,
+}
+
+
+def update_gui_monitor(message: DecodedMessage, static: bool = False) -> None:
     """Updates the monitor.
 
-    :param data: MIDI data.
+    :param message: Decoded MIDI message.
     :param static: Live or static mode.
 
     """
@@ -62,52 +129,16 @@ def update_gui_monitor(data: mido.Message, static: bool = False) -> None:
     reset_mon(static=True)  # Reset monitor before decoding to avoid keeping old data from selected history row.
 
     # Status
-    mon(data.type, static)
+    status(message.status, static)
 
     # Channel
-    chan_val = None
-    if hasattr(data, 'channel'):
+    if message.channel is not None:
         mon('c', static)  # CHANNEL
-        mon(data.channel, static)
+        channel(message.channel, static)
     else:
         mon('s', static)  # SYSTEM
 
     # Data 1 & 2
-    if 'note' in data.type:
-        if dpg.get_value('zero_velocity_note_on_is_note_off') and data.velocity == NOTE_OFF_VELOCITY:
-            mon('note_off', static)
-        # Keyboard
-        if 'on' in data.type and not (
-                dpg.get_value('zero_velocity_note_on_is_note_off') and data.velocity == NOTE_OFF_VELOCITY
-        ):
-            note_on(data.note, static, data.velocity)
-        else:
-            note_off(data.note, static)
-    elif 'polytouch' == data.type:
-        if static:
-            note_on(data.note, static)
-    elif 'control_change' == data.type:
-        cc(data.control, data.value, static)
-    elif 'program_change' == data.type:
-        # TODO: Optionally decode General MIDI names.
-        pass
-    elif 'aftertouch' == data.type:
-        # TODO: display
-        pass
-    elif 'pitchwheel' == data.type:
-        # TODO: display
-        pass
-    elif 'sysex' == data.type:
-        decoded_sysex = DecodedSysEx(data.data)
-        _update_gui_sysex(decoded_sysex)
-    elif 'quarter_frame' == data.type:
-        # TODO: display
-        pass
-    elif 'songpos' == data.type:
-        # TODO: display
-        pass
-    elif 'song_select' == data.type:
-        # TODO: display
-        pass
-
-
+    handler = _HANDLERS.get(message.kind)
+    if handler is not None:
+        handler(message, static)
@@ -7,7 +7,7 @@
 Settings options.
 """
 
-import midiexplorer.midi.notes
+from midiexplorer.midi import notes
 
 # TODO: add both?
 eox_categories = (
@@ -15,7 +15,30 @@ eox_categories = (
     "System Exclusive Message"
 )
 notation_modes = {
-    "English Alphabetical (default)": midiexplorer.midi.notes.MIDI_NOTES_ALPHA_EN,
-    "Syllabic": midiexplorer.midi.notes.MIDI_NOTES_SYLLABIC,
-    "German Alphabetic ": midiexplorer.midi.notes.MIDI_NOTES_ALPHA_DE,
+    "English Alphabetical (default)": notes.MIDI_NOTES_ALPHA_EN,
+    "Syllabic": notes.MIDI_NOTES_SYLLABIC,
+    "German Alphabetic ": notes.MIDI_NOTES_ALPHA_DE,
 }
+
+
+def get_notation(mode: str) -> tuple[str, ...]:
+    """Note names of a notation mode.
+
+    :param mode: Notation mode name.
+    :return: Note names by MIDI note number.
+
+    """
+    names = notation_modes[mode]
+    return tuple(names[number] for number in range(128))
+
+
+###
+# GLOBAL VARIABLES
+#
+# Cached preferences read on the hot path. Only updated by the settings callbacks.
+#
+# FIXME: global variables should ideally be eliminated as they are a poor programming style
+###
+notation = get_notation(next(iter(notation_modes.keys())))  # Active note names by number
+zero_velocity_note_on_is_note_off = True  # Per standard, consider note-on with velocity set to 0 as note-off
+blink_duration = .25  # seconds
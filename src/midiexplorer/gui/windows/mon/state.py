@@ -0,0 +1,114 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Monitor state.
+"""
+import heapq
+
+STATIC = float('inf')  # Expiry time of indicators lit in static mode
+
+
+class MonitorState:
+    """What is currently lit or displayed in the monitor.
+
+    Allows resetting the monitor by only processing what needs to be.
+    Only used from the main thread: GUI callbacks queue their monitor updates.
+
+    """
+
+    def __init__(self) -> None:
+        self.indicators: dict[int, float] = {}  # Lit indicators item ID: expiry time (s)
+        self.expiries: list[tuple[float, int]] = []  # Min-heap of expiry times (s). May contain outdated entries.
+        self.notes: dict[int, bool] = {}  # Lit notes and whether they are static
+        self.sysex = False  # Whether SysEx decoding fields are populated
+
+    def light(self, indicator: int, until: float) -> None:
+        """Records a lit indicator.
+
+        :param indicator: Indicator item ID.
+        :param until: Expiry time (s). STATIC never expires.
+
+        """
+        self.indicators[indicator] = until
+        if until != STATIC:
+            heapq.heappush(self.expiries, (until, indicator))
+
+    def expired(self, now: float) -> list[int]:
+        """Pops the expired indicators.
+
+        Entries superseded by a later lighting of the same indicator are discarded.
+
+        :param now: Current time (s).
+        :return: Indicator item IDs.
+
+        """
+        expired = []
+        expiries = self.expiries
+        while expiries and expiries[0][0] < now:
+            until, indicator = heapq.heappop(expiries)
+            if self.indicators.get(indicator) == until:
+                del self.indicators[indicator]
+                expired.append(indicator)
+        return expired
+
+    def lit_indicators(self, static: bool = False) -> list[int]:
+        """Pops the lit indicators.
+
+        :param static: Only the static ones.
+        :return: Indicator item IDs.
+
+        """
+        if not static:
+            indicators = list(self.indicators)
+            self.indicators.clear()
+            self.expiries.clear()
+            return indicators
+        indicators = [indicator for indicator, until in self.indicators.items() if until == STATIC]
+        for indicator in indicators:
+            del self.indicators[indicator]
+        return indicators
+
+    def lit_notes(self, static: bool = False) -> list[int]:
+        """Pops the lit notes.
+
+        :param static: Only the static ones.
+        :return: Note numbers.
+
+        """
+        if not static:
+            notes = list(self.notes)
+            self.notes.clear()
+            return notes
+        notes = [note for note, note_static in self.notes.items() if note_static]
+        for note in notes:
+            del self.notes[note]
+        return notes
+
+
+class MonitorDelta:
+    """Monitor changes accumulated during a frame.
+
+    Only the latest change per widget is kept so a burst of messages costs
+    a single widget update per touched indicator when flushed.
+
+    """
+
+    def __init__(self) -> None:
+        self.lamps: dict[int, str | None] = {}  # Indicator item ID: theme
+        self.notes: dict[int, str | None] = {}  # Note item ID: theme
+        self.values: dict[int, int] = {}  # Note velocity or controller value item ID: value
+
+    def __bool__(self) -> bool:
+        return bool(self.lamps or self.notes or self.values)
+
+    def clear(self) -> None:
+        """Forgets all changes.
+
+        """
+        self.lamps.clear()
+        self.notes.clear()
+        self.values.clear()
@@ -7,8 +7,11 @@
 """
 Standard MIDI File (SMF) window and management.
 """
-import re
-from typing import Any, Optional
+import queue
+import threading
+import time
+from functools import partial
+from typing import Any, Callable, Iterator, Optional
 
 import midi_const
 from dearpygui import dearpygui as dpg
@@ -18,6 +21,30 @@ from midiexplorer.__config__ import DEBUG
 from midiexplorer.gui.helpers import smf
 from midiexplorer.gui.helpers.callbacks.debugging import \
     enable as enable_dpg_cb_debugging
+from midiexplorer.gui.helpers.hexview import HexView
+from midiexplorer.gui.helpers.logger import Logger
+from midiexplorer.midi.smf import StandardMidiFile, Track
+
+POPULATE_BUDGET = .004  # GUI population time per frame (s)
+EVENTS_PAGE_SIZE = 1000  # Events per tree node group
+
+###
+# GLOBAL VARIABLES
+#
+# FIXME: global variables should ideally be eliminated as they are a poor programming style
+###
+actions: queue.SimpleQueue = queue.SimpleQueue()  # Requests from the GUI callbacks, run by update()
+loaded: queue.SimpleQueue = queue.SimpleQueue()  # (request, filename, smf_file, midifile, error) from the worker
+loading = 0  # Current load request number. Outdated results are discarded.
+population: Iterator[float] | None = None  # Pending GUI population steps
+progress: Optional['ProgressBar'] = None
+smf_file: StandardMidiFile | None = None  # Mapped file and events index
+indexed = False  # Whether the events index matches the decoded file. Enables cross-highlighting.
+hex_view: HexView | None = None  # Raw contents
+lazy_nodes: dict[int | str, Callable[[int | str], None]] = {}  # Children builders by unexpanded tree node
+tree_nodes: dict[tuple[str, int, int], int | str] = {}  # Created nodes by (kind, track, first event)
+tree_spans: dict[int | str, tuple[int, int]] = {}  # File portion (offset, length) by tree node
+highlighted: int | str | None = None  # Tree node matching the raw contents selection
 
 
 def create() -> None:
@@ -31,6 +58,13 @@ def create() -> None:
     with dpg.value_registry():
         dpg.add_string_value(tag="SMF")
 
+    ###
+    # Theme for the decoded portion matching the raw selection
+    ###
+    with dpg.theme(tag='smf_highlight'):
+        with dpg.theme_component(dpg.mvTreeNode):
+            dpg.add_theme_color(target=dpg.mvThemeCol_Text, value=(255, 255, 0))
+
     ###
     # Window
     ###
@@ -93,6 +127,15 @@ def toggle(sender: int | str, app_data: Any, user_data: Optional[Any]) -> None:
 
 
 def init():
+    """Resets the window to its initial state.
+
+    Must run on the main thread: use close() from callbacks.
+
+    """
+    global loading, population
+
+    loading += 1  # Discards any file being parsed
+    population = None
     clear()
     dpg.disable_item('smf_close')
     # TODO: allow drag-dropping a supported file
@@ -101,138 +144,405 @@ def init():
 
 
 def clear():
+    global smf_file, indexed, hex_view, highlighted
+
+    if hex_view is not None:
+        hex_view.delete()
+        hex_view = None
+    if smf_file is not None:
+        smf_file.close()
+        smf_file = None
+    indexed = False
+    lazy_nodes.clear()
+    tree_nodes.clear()
+    tree_spans.clear()
+    highlighted = None
     dpg.delete_item('smf_container', children_only=True)
+    if dpg.does_item_exist('smf_tree_handlers'):
+        dpg.delete_item('smf_tree_handlers')
+
+
+def load(filename: str) -> None:
+    """Requests loading an SMF.
+
+    Callbacks run on their own thread: the request is handled by update() on the main thread.
+
+    :param filename: SMF path.
+
+    """
+    actions.put(partial(_load, filename))
+
+
+def close() -> None:
+    """Requests closing the current SMF.
+
+    Callbacks run on their own thread: the request is handled by update() on the main thread.
+
+    """
+    actions.put(init)
+
+
+def _load(filename: str) -> None:
+    """Loads an SMF in the background.
+
+    The file is parsed by a worker thread. The GUI is then populated by update() in per-frame chunks.
 
+    :param filename: SMF path.
 
-def populate(file_bytes: bytes, midifile: MidiFile):
+    """
+    global loading, population, progress
+
+    loading += 1
+    population = None
     clear()
     dpg.enable_item('smf_close')
+    progress = ProgressBar('smf_container')
+    progress.state("Parsing")
+    threading.Thread(target=smf.parse, args=(filename, loading, loaded), daemon=True).start()
+
+
+def update() -> None:
+    """Handles the SMF requests and loading progress each frame.
+
+    Runs the requests from the GUI callbacks,
+    retrieves the parsed file from the worker thread
+    then populates the GUI within the frame time budget.
+    The window contents and the mapped file are therefore only ever modified from the main thread.
+
+    """
+    global population, smf_file
+
+    while not actions.empty():
+        actions.get_nowait()()
+
+    if hex_view is not None:
+        hex_view.refresh()
+
+    while not loaded.empty():
+        request, filename, mapped_file, midifile, error = loaded.get_nowait()
+        if request != loading:
+            if mapped_file is not None:
+                mapped_file.close()
+            continue  # Outdated: closed or superseded by another file
+        if error is not None:
+            Logger().log_warning(f"Unable to load {filename}: {error!s}")
+            init()
+            return
+        smf_file = mapped_file
+        population = populate(mapped_file, midifile)
+
+    if population is None:
+        return
+    value = None
+    deadline = time.perf_counter() + POPULATE_BUDGET
+    try:
+        while time.perf_counter() < deadline:
+            value = next(population)
+    except StopIteration:
+        population = None
+    if value is not None:
+        progress.value(value)
+
+
+def populate(mapped_file: StandardMidiFile, midifile: MidiFile | None) -> Iterator[float]:
+    """Populates the GUI with the SMF contents step by step.
+
+    Items are created with an explicit parent so that steps can be spread over several frames.
+    The raw contents view is virtualized and therefore created at once.
+    Tracks contents are only created when expanded.
+
+    :param mapped_file: Raw file and events index.
+    :param midifile: Decoded file. None for files other than SMF which are only displayed raw.
+    :return: Iterator yielding the progress after each step.
+
+    """
+    global hex_view, indexed
+
     parent = 'smf_container'
-    file_size = len(file_bytes)
-
-    progress = ProgressBar(parent)
-
-    with dpg.group(tag='smf_contents', parent=parent, horizontal=True):
-        with dpg.group(label='RAW', tag='smf_raw_contents', show=False):
-            with dpg.table(header_row=True, freeze_rows=1, policy=dpg.mvTable_SizingStretchProp,
-                           borders_innerH=False, borders_outerH=True,
-                           borders_innerV=False, borders_outerV=True,
-                           scrollY=True, width=640):
-                # Update progress indicator
-                progress.state("Raw")
-
-                # Header
-                dpg.add_table_column(label="Offset (hex)")
-                for index in range(0x00, 0x0F + 1):
-                    dpg.add_table_column(label=f"{index:02X}")
-                dpg.add_table_column(label="Decoded (ASCII)")
-
-                digits = len(hex(file_size)) + 1
-                for offset in range(0x00, file_size + 1, 0x10):
-                    # Update progress indicator
-                    progress.value((offset / file_size) / 2)
-                    with dpg.table_row():
-                        dpg.add_text(f"{offset:0{digits}X}")  # Offset
-                        chunk = file_bytes[offset:offset + 0x0F + 1]
-                        for index in range(0x00, 0x0F + 1):
-                            try:
-                                dpg.add_selectable(label=f"{chunk[index]:02X}",
-                                                   callback=_selected_hex,
-                                                   user_data=(offset, index))
-                            except IndexError:  # We may reach the end of the file earlier than the table width
-                                dpg.add_text()
-                        dotted_ascii = re.sub(r'[^\x32-\x7f]', '.', chunk.decode('ascii', errors='replace'))
-                        dpg.add_text(dotted_ascii)
-
-            # if DEBUG:
-            #    dpg.add_text(f"{file_bytes!r}", wrap=80)
-
-        # Update progress indicator
-        progress.value(.5)
-
-        with dpg.group(label='Decoded', tag='smf_decoded_contents', show=False):
-            # Update progress indicator
-            progress.state("Events")
-
-            with dpg.tree_node(label=f"{midifile.filename}", default_open=True):
-
-                dpg.add_tree_node(label=f"Size: {file_size} bytes", leaf=True)
-
-                with dpg.tree_node(label="Header", default_open=True, selectable=True):
-                    dpg.configure_item(dpg.last_item(), callback=_selected_decode, user_data=range(0, 7))
-                    smf_format = midi_const.SMF_HEADER_FORMATS[midifile.type]
-                    dpg.add_tree_node(label=f"Format: {midifile.type} ({smf_format})", leaf=True, selectable=True)
-                    dpg.add_tree_node(label=f"Number of tracks: {len(midifile.tracks)}", leaf=True, selectable=True)
-                    # FIXME: Upstream: mido. Support SMPTE division format.
-                    dpg.add_tree_node(label=f"Division: {midifile.ticks_per_beat} ticks per quarter-note",
-                                      leaf=True, selectable=True)
-
-                tracks_total = len(midifile.tracks)
-                for i, track in enumerate(midifile.tracks):
-                    # Update progress indicator
-                    progress.value(((i / tracks_total) / 2) + .5)
-                    with dpg.tree_node(label=f"Track #{i} {track.name}", selectable=True):
-                        for j, event in enumerate(track):
-                            if isinstance(event, MetaMessage):
-                                event_type = 'Meta'
-                            # FIXME: Upstream: mido. Support Sysex event type and subtypes.
-                            if isinstance(event, Message):
-                                event_type = 'MIDI'
-                            with dpg.tree_node(label=f"Event #{j} {event_type} {event.type}", selectable=True):
-                                dpg.add_tree_node(label=f"Delta-time: {event.time}", leaf=True, selectable=True)
-                                with dpg.tree_node(label=f"Type: {event.type}", selectable=True):
-                                    # TODO: decode
-                                    if DEBUG:
-                                        dpg.add_tree_node(label=f"{event!r}", leaf=True)
-
-            # if DEBUG:
-            #     dpg.add_text(f"{midifile!r}")
-
-        # Update progress indicator
+    file_size = len(mapped_file)
+
+    progress.state("Raw")
+
+    contents = dpg.add_group(tag='smf_contents', parent=parent, horizontal=True)
+    raw = dpg.add_group(label='RAW', tag='smf_raw_contents', show=False, parent=contents)
+    hex_view = HexView(raw, mapped_file.buffer, callback=_selected_hex)
+
+    yield .5
+
+    decoded = dpg.add_group(label='Decoded', tag='smf_decoded_contents', show=False, parent=contents)
+    if midifile is None:
+        dpg.add_text(f"{mapped_file.filename}", parent=decoded)
+        dpg.add_text(f"Size: {file_size} bytes", parent=decoded)
+        dpg.add_text("Not a Standard MIDI File: raw contents only.", parent=decoded)
         progress.state("Complete")
-        progress.value(1.0)
+        yield 1.0
+        return
+
+    progress.state("Events")
+
+    root = dpg.add_tree_node(label=f"{midifile.filename}", default_open=True, parent=decoded)
+
+    dpg.add_tree_node(label=f"Size: {file_size} bytes", leaf=True, parent=root)
+
+    # Tree nodes don't support callbacks.
+    # Contents are only created when expanded and selection highlights the matching file portion.
+    with dpg.item_handler_registry(tag='smf_tree_handlers'):
+        dpg.add_item_toggled_open_handler(callback=_expanded)
+        dpg.add_item_clicked_handler(callback=_selected_decode)
+
+    # The index may be missing for malformed files or not match mido's tracks
+    indexed = mapped_file.header is not None and len(mapped_file.tracks) >= len(midifile.tracks) and all(
+        len(index) == len(track) for index, track in zip(mapped_file.tracks, midifile.tracks)
+    )
+    header_span = format_span = tracks_span = division_span = None
+    if indexed:
+        chunk = mapped_file.header
+        header_span = (chunk.offset, chunk.end - chunk.offset)
+        format_span = (chunk.start, 2)
+        tracks_span = (chunk.start + 2, 2)
+        division_span = (chunk.start + 4, 2)
+    else:
+        Logger().log_warning(f"Unable to index {midifile.filename} events: decoded portions won't be highlighted.")
+
+    header = _add_node("Header", root, ('header', 0, 0), header_span, default_open=True)
+    smf_format = midi_const.SMF_HEADER_FORMATS[midifile.type]
+    _add_node(f"Format: {midifile.type} ({smf_format})", header, span=format_span, leaf=True)
+    _add_node(f"Number of tracks: {len(midifile.tracks)}", header, span=tracks_span, leaf=True)
+    # FIXME: Upstream: mido. Support SMPTE division format.
+    _add_node(f"Division: {midifile.ticks_per_beat} ticks per quarter-note", header, span=division_span,
+              leaf=True)
+
+    tracks_total = len(midifile.tracks)
+    for i, track in enumerate(midifile.tracks):
+        index = mapped_file.tracks[i] if indexed else None
+        span = (index.chunk.offset, index.chunk.end - index.chunk.offset) if indexed else None
+        _add_lazy_node(f"Track #{i} {track.name} ({len(track)} events)", root,
+                       partial(_populate_track, i, track, index), ('track', i, 0), span)
+        yield ((i + 1) / tracks_total) / 2 + .5
+
+    # if DEBUG:
+    #     dpg.add_text(f"{midifile!r}")
+
+    progress.state("Complete")
+    yield 1.0
+
+
+def _add_node(label: str, parent: int | str, key: tuple[str, int, int] | None = None,
+              span: tuple[int, int] | None = None, **kwargs) -> int | str:
+    """Adds a selectable tree node.
+
+    :param label: Node label.
+    :param parent: Parent node.
+    :param key: Registers the node for lookup from the raw contents.
+    :param span: File portion (offset, length) to highlight when selected.
+    :param kwargs: Additional tree node parameters.
+    :return: Node.
+
+    """
+    node = dpg.add_tree_node(label=label, selectable=True, parent=parent, **kwargs)
+    dpg.bind_item_handler_registry(node, 'smf_tree_handlers')
+    if key is not None:
+        tree_nodes[key] = node
+    if span is not None:
+        tree_spans[node] = span
+    return node
+
+
+def _add_lazy_node(label: str, parent: int | str, build: Callable[[int | str], None],
+                   key: tuple[str, int, int] | None = None, span: tuple[int, int] | None = None) -> int | str:
+    """Adds a tree node whose children are created on first expansion.
+
+    :param label: Node label.
+    :param parent: Parent node.
+    :param build: Called with the node to create its children.
+    :param key: Registers the node for lookup from the raw contents.
+    :param span: File portion (offset, length) to highlight when selected.
+    :return: Node.
 
+    """
+    node = _add_node(label, parent, key, span)
+    lazy_nodes[node] = build
+    return node
+
+
+def _build(node: int | str) -> None:
+    """Creates the node children if not already done.
+
+    :param node: Tree node.
+
+    """
+    build = lazy_nodes.pop(node, None)
+    if build is not None:
+        build(node)
 
-def _selected_decode(sender: int | str, app_data: Any, user_data: Optional[Any]) -> None:
-    """Generic Dear PyGui callback for debug purposes.
+
+def _expand(node: int | str) -> None:
+    """Creates the node children if needed and opens it.
+
+    :param node: Tree node.
+
+    """
+    _build(node)
+    dpg.set_value(node, True)
+
+
+def _expanded(sender: int | str, app_data: Any, user_data: Optional[Any]) -> None:
+    """Tree node toggled open callback.
+
+    Creates the node children on first expansion.
 
     :param sender: argument is used by DPG to inform the callback
                    which item triggered the callback by sending the tag
                    or 0 if trigger by the application.
     :param app_data: argument is used by DPG to send information to the callback
-                     i.e. the current value of most basic widgets.
+                     i.e. the toggled item.
     :param user_data: argument is Optionally used to pass your own python data into the function.
 
     """
     if DEBUG:
         enable_dpg_cb_debugging(sender, app_data, user_data)
-    if app_data:
-        for index in user_data:
-            row = int(index / 0x0F)
-            index = index % 0x0F
-            # FIXME: highlight file portions when selecting in decoded view
-            pass
-    raise NotImplementedError
+    actions.put(partial(_build, app_data))
+
+
+def _populate_track(number: int, track: list, index: Track | None, node: int | str) -> None:
+    """Creates a track events or events groups.
+
+    :param number: Track number.
+    :param track: Track events.
+    :param index: Track events index. None if it doesn't match the events.
+    :param node: Track node.
+
+    """
+    events_total = len(track)
+    if events_total <= EVENTS_PAGE_SIZE:
+        _populate_events(number, track, index, 0, events_total, node)
+        return
+    for start in range(0, events_total, EVENTS_PAGE_SIZE):
+        stop = min(start + EVENTS_PAGE_SIZE, events_total)
+        span = None
+        if index is not None:
+            offset = index.offsets[start]
+            span = (offset, index.offsets[stop - 1] + index.lengths[stop - 1] - offset)
+        _add_lazy_node(f"Events {start}-{stop - 1}", node, partial(_populate_events, number, track, index, start, stop),
+                       ('page', number, start), span)
+
+
+def _populate_events(number: int, track: list, index: Track | None, start: int, stop: int, node: int | str) -> None:
+    """Creates a range of track events.
+
+    :param number: Track number.
+    :param track: Track events.
+    :param index: Track events index. None if it doesn't match the events.
+    :param start: First event index.
+    :param stop: Index after the last event.
+    :param node: Parent node.
+
+    """
+    for j in range(start, stop):
+        event = track[j]
+        if isinstance(event, MetaMessage):
+            event_type = 'Meta'
+        # FIXME: Upstream: mido. Support Sysex event type and subtypes.
+        if isinstance(event, Message):
+            event_type = 'MIDI'
+        _add_lazy_node(f"Event #{j} {event_type} {event.type}", node, partial(_populate_event, event),
+                       ('event', number, j), index.span(j) if index is not None else None)
+
+
+def _populate_event(event: Message | MetaMessage, node: int | str) -> None:
+    """Creates an event details.
+
+    :param event: Track event.
+    :param node: Event node.
+
+    """
+    dpg.add_tree_node(label=f"Delta-time: {event.time}", leaf=True, selectable=True, parent=node)
+    type_node = dpg.add_tree_node(label=f"Type: {event.type}", selectable=True, parent=node)
+    # TODO: decode
+    if DEBUG:
+        dpg.add_tree_node(label=f"{event!r}", leaf=True, parent=type_node)
+
+
+def _highlight(node: int | str | None) -> None:
+    """Highlights the tree node matching the raw contents selection.
 
+    :param node: Tree node or None to remove the highlight.
 
-def _selected_hex(sender: int | str, app_data: Any, user_data: Optional[Any]) -> None:
-    """Generic Dear PyGui callback for debug purposes.
+    """
+    global highlighted
+
+    if highlighted is not None and dpg.does_item_exist(highlighted):
+        dpg.bind_item_theme(highlighted, 0)
+    highlighted = node
+    if node is not None:
+        dpg.bind_item_theme(node, 'smf_highlight')
+
+
+def _selected_decode(sender: int | str, app_data: Any, user_data: Optional[Any]) -> None:
+    """Decoded contents selection callback.
+
+    Highlights the matching file portion.
 
     :param sender: argument is used by DPG to inform the callback
                    which item triggered the callback by sending the tag
                    or 0 if trigger by the application.
     :param app_data: argument is used by DPG to send information to the callback
-                     i.e. the current value of most basic widgets.
+                     i.e. the mouse button and the clicked item.
     :param user_data: argument is Optionally used to pass your own python data into the function.
 
     """
     if DEBUG:
         enable_dpg_cb_debugging(sender, app_data, user_data)
-    if app_data:
-        offset, index = user_data
-        # FIXME: highlight decoded portions when selecting in the file view
-        pass
-    raise NotImplementedError
+    _, node = app_data
+    actions.put(partial(_select_span, node))
+
+
+def _select_span(node: int | str) -> None:
+    """Highlights the file portion matching a tree node.
+
+    :param node: Tree node.
+
+    """
+    span = tree_spans.get(node)
+    if span is None or hex_view is None:
+        return
+    hex_view.select(*span)
+    _highlight(node)
+
+
+def _selected_hex(offset: int) -> None:
+    """Raw contents selection callback.
+
+    :param offset: Selected byte offset in the file.
+
+    """
+    actions.put(partial(_reveal, offset))
+
+
+def _reveal(offset: int) -> None:
+    """Reveals and highlights the decoded portion matching a file position.
+
+    Lookups are bisections of the events index.
+
+    :param offset: Byte offset in the file.
+
+    """
+    if smf_file is None or not indexed:
+        return  # Event numbers wouldn't match the decoded tree
+    node = None
+    location = smf_file.locate(offset)
+    if location is not None:
+        number, event = location
+        node = tree_nodes.get(('track', number, 0))
+        if node is not None and event is not None:
+            _expand(node)
+            page = tree_nodes.get(('page', number, event - event % EVENTS_PAGE_SIZE))
+            if page is not None:
+                _expand(page)
+            node = tree_nodes.get(('event', number, event), node)
+    elif offset < smf_file.header.end:
+        node = tree_nodes.get(('header', 0, 0))
+    _highlight(node)
 
 
 class ProgressBar:
@@ -251,7 +561,7 @@ class ProgressBar:
         self._value = value
         self._human_readable: str = f"{round(value * 100)}%"
         self._update_progress()
-        if value == .5:
+        if value >= .5:
             dpg.show_item('smf_raw_contents')
         if value == 1.0:
             dpg.show_item('smf_decoded_contents')
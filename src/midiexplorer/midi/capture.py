@@ -0,0 +1,133 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Memory-mapped MIDI capture file.
+
+Captures are temporary by default: the files are anonymous and deleted as soon as they are closed,
+including when the application exits. They can't be reopened.
+"""
+import mmap
+import struct
+import tempfile
+from typing import BinaryIO
+
+# Fixed-size record:
+# timestamp (ns), delta (ns), source ID, destination ID, length, inline data or payload offset
+RECORD = struct.Struct('<qqHHI8s')
+INLINE_SIZE = 8  # Longer messages are stored in the payload file
+PAYLOAD_OFFSET = struct.Struct('<Q')
+INITIAL_SIZE = mmap.ALLOCATIONGRANULARITY * 16
+
+
+class _MappedFile:
+    """Append-only memory-mapped file growing on demand.
+
+    """
+
+    def __init__(self, file: BinaryIO) -> None:
+        self._file = file
+        self._capacity = INITIAL_SIZE
+        self._file.truncate(self._capacity)
+        self.map = mmap.mmap(self._file.fileno(), self._capacity)
+        self.size = 0
+
+    def reserve(self, length: int) -> int:
+        """Reserves space at the end of the file.
+
+        :param length: Number of bytes.
+        :return: Offset of the reserved space.
+
+        """
+        offset = self.size
+        self.size += length
+        if self.size > self._capacity:
+            while self.size > self._capacity:
+                self._capacity *= 2
+            # Remapping is more portable than mmap.resize()
+            self.map.close()
+            self._file.truncate(self._capacity)
+            self.map = mmap.mmap(self._file.fileno(), self._capacity)
+        return offset
+
+    def close(self) -> None:
+        """Unmaps and closes the file.
+
+        """
+        self.map.close()
+        self._file.close()
+
+
+class CaptureFile:
+    """Append-only capture of MIDI messages with one fixed-size record per message.
+
+    Messages longer than the inline size are stored in a companion payload file
+    and their record points to them.
+
+    """
+
+    def __init__(self, records: BinaryIO | None = None, payloads: BinaryIO | None = None) -> None:
+        """Creates the capture.
+
+        :param records: Writable binary file to store records to. Defaults to a temporary file.
+        :param payloads: Writable binary file to store long messages to. Defaults to a temporary file.
+
+        """
+        self._records = _MappedFile(records or tempfile.TemporaryFile(prefix='midiexplorer-', suffix='.cap'))
+        self._payloads = _MappedFile(payloads or tempfile.TemporaryFile(prefix='midiexplorer-', suffix='.pld'))
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, timestamp: int, delta: int, source: int, destination: int, data: bytes) -> int:
+        """Appends a message record.
+
+        :param timestamp: Message timestamp (nanoseconds).
+        :param delta: Delta to the previous message timestamp (nanoseconds).
+        :param source: Source ID.
+        :param destination: Destination ID.
+        :param data: Raw MIDI message.
+        :return: Record index.
+
+        """
+        length = len(data)
+        if length > INLINE_SIZE:
+            offset = self._payloads.reserve(length)
+            self._payloads.map[offset:offset + length] = data
+            data = PAYLOAD_OFFSET.pack(offset)
+        position = self._records.reserve(RECORD.size)
+        RECORD.pack_into(self._records.map, position, timestamp, delta, source, destination, length, data)
+        index = self._count
+        self._count += 1
+        return index
+
+    def record(self, index: int) -> tuple[int, int, int, int, bytes]:
+        """Reads a message record.
+
+        :param index: Record index.
+        :return: Timestamp (ns), delta (ns), source ID, destination ID and raw MIDI message.
+        :raises: IndexError -- The record doesn't exist.
+
+        """
+        if not 0 <= index < self._count:
+            raise IndexError(f"Capture record #{index} out of range")
+        timestamp, delta, source, destination, length, data = RECORD.unpack_from(
+            self._records.map, index * RECORD.size
+        )
+        if length > INLINE_SIZE:
+            offset, = PAYLOAD_OFFSET.unpack(data)
+            data = self._payloads.map[offset:offset + length]
+        else:
+            data = data[:length]
+        return timestamp, delta, source, destination, data
+
+    def close(self) -> None:
+        """Closes the capture files.
+
+        """
+        self._records.close()
+        self._payloads.close()
@@ -7,3 +7,5 @@
 """
 MIDI decoders.
 """
+# Registers the universal System Exclusive sub-decoders
+from midiexplorer.midi.decoders import universal  # pylint: disable=unused-import
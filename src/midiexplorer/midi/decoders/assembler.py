@@ -0,0 +1,168 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Streaming system exclusive assembler.
+
+Backends may deliver long system exclusive messages in several chunks.
+Real time messages can also legally be interleaved within them.
+"""
+import re
+from enum import IntEnum
+
+from midiexplorer.midi.decoders.message import EOX, SYSEX
+
+DEFAULT_MAX_SIZE = 16 * 1024 * 1024  # bytes
+DEFAULT_PROGRESS_STEP = 64 * 1024  # bytes
+REAL_TIME = 0xF8  # First real time status byte
+
+_STATUS_BYTE = re.compile(rb'[\x80-\xFF]')
+
+
+class Event(IntEnum):
+    """Assembler events.
+
+    """
+    MESSAGE = 0  # Complete message. Data: raw message.
+    PROGRESS = 1  # System exclusive in progress. Data: bytes received so far.
+    OVERFLOW = 2  # System exclusive discarded for exceeding the maximum size. Data: bytes received.
+    ABORTED = 3  # System exclusive interrupted by a status byte other than EOX. Data: bytes received.
+
+
+class SysExAssembler:
+    """Incrementally reassembles system exclusive messages from chunks.
+
+    Other messages are expected to be delivered whole and are passed through.
+    Real time bytes found in a system exclusive message are passed through as soon as they are seen.
+
+    The message is accumulated in a single buffer which is handed over as is on completion.
+
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, progress_step: int = DEFAULT_PROGRESS_STEP) -> None:
+        """Creates the assembler.
+
+        :param max_size: Maximum system exclusive message size (bytes), including SOX and EOX.
+        :param progress_step: Bytes received between progress events.
+
+        """
+        self.max_size = max_size
+        self.progress_step = progress_step
+        self._buffer: bytearray | None = None  # System exclusive in progress
+        self._discarding = False  # Skip data bytes until the next status byte
+        self._received = 0  # Bytes received for the current system exclusive, including discarded ones
+        self._next_progress = progress_step
+
+    @property
+    def pending(self) -> bool:
+        """Whether a system exclusive message is in progress.
+
+        :return: Message in progress.
+
+        """
+        return self._buffer is not None or self._discarding
+
+    @property
+    def received(self) -> int:
+        """Size of the system exclusive message in progress.
+
+        :return: Bytes received so far.
+
+        """
+        return self._received
+
+    def reset(self) -> None:
+        """Drops any system exclusive message in progress.
+
+        """
+        self._buffer = None
+        self._discarding = False
+        self._received = 0
+        self._next_progress = self.progress_step
+
+    def feed(self, chunk: bytes) -> list[tuple[Event, bytes | bytearray | int]]:
+        """Processes a chunk of received data.
+
+        :param chunk: Raw MIDI data.
+        :return: Resulting (event, data) pairs in order.
+
+        """
+        events = []
+        if not chunk:
+            return events
+        if not self.pending and chunk[0] != SYSEX:
+            events.append((Event.MESSAGE, chunk))  # Fast path: whole message
+            return events
+
+        position = 0
+        length = len(chunk)
+        while position < length:
+            if not self.pending:
+                if chunk[position] != SYSEX:
+                    events.append((Event.MESSAGE, chunk[position:]))
+                    break
+                self._buffer = bytearray()
+                self._received = 0
+                self._next_progress = self.progress_step
+
+            # Data bytes up to the next status byte are appended at once
+            match = _STATUS_BYTE.search(chunk, position + (1 if chunk[position] == SYSEX else 0))
+            end = match.start() if match else length
+            if chunk[position] == SYSEX:
+                if self._received:
+                    # A new SOX interrupts the previous system exclusive
+                    events.append((Event.ABORTED, self._received))
+                    self.reset()
+                    self._buffer = bytearray()
+                self._buffer.append(SYSEX)
+                self._received = 1
+                position += 1
+            self._append(chunk, position, end, events)
+            position = end
+            if position >= length:
+                break
+
+            status = chunk[position]
+            if status >= REAL_TIME:
+                events.append((Event.MESSAGE, chunk[position:position + 1]))
+                position += 1
+            elif status == EOX:
+                self._received += 1
+                if not self._discarding:
+                    self._buffer.append(EOX)
+                    events.append((Event.MESSAGE, self._buffer))
+                self.reset()
+                position += 1
+            elif status != SYSEX:
+                # Any other status byte terminates the system exclusive
+                events.append((Event.ABORTED, self._received))
+                self.reset()
+
+        if self._received >= self._next_progress:
+            events.append((Event.PROGRESS, self._received))
+            self._next_progress = (self._received // self.progress_step + 1) * self.progress_step
+        return events
+
+    def _append(self, chunk: bytes, start: int, end: int, events: list) -> None:
+        """Appends data bytes to the system exclusive in progress.
+
+        :param chunk: Raw MIDI data.
+        :param start: First data byte position.
+        :param end: Position after the last data byte.
+        :param events: Events list to report an overflow to.
+
+        """
+        if start >= end:
+            return
+        self._received += end - start
+        if self._discarding:
+            return
+        if self._received > self.max_size:
+            events.append((Event.OVERFLOW, self._received))
+            self._buffer = None
+            self._discarding = True
+            return
+        self._buffer += memoryview(chunk)[start:end]  # Avoids an intermediate copy
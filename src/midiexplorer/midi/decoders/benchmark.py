@@ -0,0 +1,93 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+System Exclusive decoders throughput benchmark.
+
+Decodes a dense stream of each registered message type
+and compares the throughput to the MIDI 1.0 line rate.
+
+Usage: python -m midiexplorer.midi.decoders.benchmark [iterations]
+"""
+import sys
+import timeit
+
+from midiexplorer.midi.decoders.message import decode
+from midiexplorer.midi.decoders.sysex import DecodedSysEx, SUB_DECODERS
+
+LINE_RATE = 31250 // 10  # Bytes per second: 31.25 kbaud, 10 bits per byte
+DEFAULT_ITERATIONS = 10000
+
+# Sample message by registered decoder name
+SAMPLES: dict[str, bytes] = {
+    'DecodedUniversalNonRealTimeSysExPayload': bytes([0xF0, 0x7E, 0x7F, 0x09, 0x01, 0xF7]),
+    'DecodedUniversalRealTimeSysExPayload': bytes([0xF0, 0x7F, 0x7F, 0x06, 0x02, 0xF7]),
+    'SampleDumpHeader': bytes([0xF0, 0x7E, 0x00, 0x01, 0x01, 0x00, 0x10, 0x10, 0x27, 0x00,
+                               0x00, 0x10, 0x00, 0x00, 0x00, 0x00, 0x7F, 0x0F, 0x00, 0x7F, 0xF7]),
+    'SampleDataPacket': bytes([0xF0, 0x7E, 0x00, 0x02, 0x00] + [0x40] * 120 + [0x00, 0xF7]),
+    'SampleDumpRequest': bytes([0xF0, 0x7E, 0x00, 0x03, 0x01, 0x00, 0xF7]),
+    'Handshake': bytes([0xF0, 0x7E, 0x00, 0x7F, 0x05, 0xF7]),
+    'IdentityRequest': bytes([0xF0, 0x7E, 0x7F, 0x06, 0x01, 0xF7]),
+    'IdentityReply': bytes([0xF0, 0x7E, 0x10, 0x06, 0x02, 0x00, 0x20, 0x29,
+                            0x01, 0x02, 0x03, 0x04, 0x01, 0x02, 0x03, 0x04, 0xF7]),
+    'FileDumpHeader': bytes([0xF0, 0x7E, 0x00, 0x07, 0x01, 0x05]) + b'MIDI' + bytes([0x00, 0x01, 0x00, 0x00])
+    + b'song.mid' + bytes([0xF7]),
+    'FileDumpDataPacket': bytes([0xF0, 0x7E, 0x00, 0x07, 0x02, 0x00, 0x77] + [0x40] * 120 + [0x00, 0xF7]),
+    'FileDumpRequest': bytes([0xF0, 0x7E, 0x00, 0x07, 0x03, 0x05]) + b'MIDI' + b'song.mid' + bytes([0xF7]),
+    'TuningDumpRequest': bytes([0xF0, 0x7E, 0x00, 0x08, 0x00, 0x00, 0xF7]),
+    'TuningDumpReply': bytes([0xF0, 0x7E, 0x00, 0x08, 0x01, 0x00]) + b'Equal temperament'[:16]
+    + bytes(byte for note in range(128) for byte in (note, 0x00, 0x00)) + bytes([0x00, 0xF7]),
+    'MTCFullMessage': bytes([0xF0, 0x7F, 0x7F, 0x01, 0x01, 0x61, 0x02, 0x03, 0x04, 0xF7]),
+    'MTCUserBits': bytes([0xF0, 0x7F, 0x7F, 0x01, 0x02] + list(range(9)) + [0xF7]),
+    'ShowControl': bytes([0xF0, 0x7F, 0x01, 0x02, 0x01, 0x01]) + b'1.5' + bytes([0xF7]),
+    'BarNumber': bytes([0xF0, 0x7F, 0x7F, 0x03, 0x01, 0x01, 0x00, 0xF7]),
+    'TimeSignature': bytes([0xF0, 0x7F, 0x7F, 0x03, 0x02, 0x04, 0x04, 0x02, 0x18, 0x08, 0xF7]),
+    'DeviceControl': bytes([0xF0, 0x7F, 0x7F, 0x04, 0x01, 0x7F, 0x7F, 0xF7]),
+    'TuningNoteChange': bytes([0xF0, 0x7F, 0x00, 0x08, 0x02, 0x00, 0x01, 0x3C, 0x3C, 0x20, 0x00, 0xF7]),
+}
+
+
+def _decode(raw: bytes) -> None:
+    """Decodes a message like the monitor does.
+
+    :param raw: Raw MIDI message.
+
+    """
+    DecodedSysEx(decode(raw).data0).payload.fields()
+
+
+def run(iterations: int = DEFAULT_ITERATIONS) -> bool:
+    """Benchmarks each registered decoder.
+
+    :param iterations: Messages decoded per decoder.
+    :return: Whether every decoder keeps up with the line rate.
+
+    """
+    keep_up = True
+    decoders = sorted({decoder.__name__ for decoder in SUB_DECODERS.values()})
+    print(f"{'Decoder':<40} {'Bytes':>5} {'Decoded/s':>12} {'Line rate/s':>12} {'Headroom':>9}")
+    for name in decoders:
+        raw = SAMPLES.get(name)
+        if raw is None:
+            print(f"{name:<40} No sample message!")
+            keep_up = False
+            continue
+        decoder = type(DecodedSysEx(decode(raw).data0).payload).__name__
+        if decoder != name:
+            print(f"{name:<40} Sample message decoded by {decoder}!")
+            keep_up = False
+            continue
+        elapsed = timeit.timeit(lambda raw=raw: _decode(raw), number=iterations)
+        rate = iterations / elapsed
+        line_rate = LINE_RATE / len(raw)
+        headroom = rate / line_rate
+        keep_up &= headroom >= 1
+        print(f"{name:<40} {len(raw):>5} {rate:>12.0f} {line_rate:>12.1f} {headroom:>8.0f}x")
+    return keep_up
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ITERATIONS) else 1)
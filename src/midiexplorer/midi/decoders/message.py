@@ -0,0 +1,216 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+MIDI message decoder.
+
+Raw messages are decoded by dispatching on their status byte through a table of handlers.
+"""
+from typing import Callable
+
+import midi_const
+
+SYSEX = 0xF0
+EOX = 0xF7
+NOTE_OFF = 0x80
+NOTE_ON = 0x90
+POLYTOUCH = 0xA0
+CONTROL_CHANGE = 0xB0
+PROGRAM_CHANGE = 0xC0
+AFTERTOUCH = 0xD0
+PITCHWHEEL = 0xE0
+QUARTER_FRAME = 0xF1
+SONGPOS = 0xF2
+SONG_SELECT = 0xF3
+NOTE_MESSAGES = {NOTE_OFF, NOTE_ON, POLYTOUCH}  # Messages whose first data byte is a note number
+
+
+class DecodedMessage:
+    """Decoded MIDI message.
+
+    """
+    __slots__ = ('raw', 'status', 'kind', 'type', 'channel',
+                 'data0_name', 'data0', 'data0_dec', 'data1_name', 'data1')
+
+    def __init__(self, raw: bytes, kind: int, message_type: str, channel: int | None = None,
+                 data0_name: str | None = None, data0: int | memoryview | None = None,
+                 data0_dec: str | None = None,
+                 data1_name: str | None = None, data1: int | None = None) -> None:
+        """Creates the decoded message.
+
+        :param raw: Raw MIDI message.
+        :param kind: Status high nibble for channel messages or the full byte for system messages.
+        :param message_type: Message type name (Same as mido).
+        :param channel: Channel number.
+        :param data0_name: First value name.
+        :param data0: First value.
+        :param data0_dec: First value meaning.
+        :param data1_name: Second value name.
+        :param data1: Second value.
+
+        """
+        self.raw = raw
+        self.status = raw[0]
+        self.kind = kind
+        self.type = message_type
+        self.channel = channel
+        self.data0_name = data0_name
+        self.data0 = data0
+        self.data0_dec = data0_dec
+        self.data1_name = data1_name
+        self.data1 = data1
+
+    def __repr__(self) -> str:
+        return f"DecodedMessage({self.type}, {self.hex()})"
+
+    def hex(self) -> str:
+        """Raw message hexadecimal representation.
+
+        :return: Space separated uppercase hexadecimal bytes (Same as mido).
+
+        """
+        return self.raw.hex(' ').upper()
+
+
+def _check_length(raw: bytes, length: int) -> None:
+    """Validates a fixed length message.
+
+    :param raw: Raw MIDI message.
+    :param length: Expected length.
+    :raises: ValueError -- The message is malformed.
+
+    """
+    if len(raw) != length:
+        raise ValueError(f"Message of type {raw[0]:02X} must be {length} byte(s) long, not {len(raw)}")
+    for byte in raw[1:]:
+        if byte > 0x7F:
+            raise ValueError(f"Data byte must be in range 0..127, not {byte}")
+
+
+def _note_off(raw: bytes) -> DecodedMessage:
+    _check_length(raw, 3)
+    return DecodedMessage(raw, NOTE_OFF, 'note_off', raw[0] & 0x0F, "Note", raw[1], None, "Velocity", raw[2])
+
+
+def _note_on(raw: bytes) -> DecodedMessage:
+    _check_length(raw, 3)
+    return DecodedMessage(raw, NOTE_ON, 'note_on', raw[0] & 0x0F, "Note", raw[1], None, "Velocity", raw[2])
+
+
+def _polytouch(raw: bytes) -> DecodedMessage:
+    _check_length(raw, 3)
+    return DecodedMessage(raw, POLYTOUCH, 'polytouch', raw[0] & 0x0F, "Note", raw[1], None, None, raw[2])
+
+
+def _control_change(raw: bytes) -> DecodedMessage:
+    _check_length(raw, 3)
+    return DecodedMessage(raw, CONTROL_CHANGE, 'control_change', raw[0] & 0x0F,
+                          "Controller", raw[1], midi_const.CONTROLLER_NUMBERS.get(raw[1]), "Value", raw[2])
+
+
+def _program_change(raw: bytes) -> DecodedMessage:
+    _check_length(raw, 2)
+    # TODO: Optionally decode General MIDI names.
+    return DecodedMessage(raw, PROGRAM_CHANGE, 'program_change', raw[0] & 0x0F, "Program", raw[1])
+
+
+def _aftertouch(raw: bytes) -> DecodedMessage:
+    _check_length(raw, 2)
+    return DecodedMessage(raw, AFTERTOUCH, 'aftertouch', raw[0] & 0x0F, "Value", raw[1])
+
+
+def _pitchwheel(raw: bytes) -> DecodedMessage:
+    _check_length(raw, 3)
+    return DecodedMessage(raw, PITCHWHEEL, 'pitchwheel', raw[0] & 0x0F,
+                          "Pitch", (raw[1] | raw[2] << 7) - 8192)  # Same as mido
+
+
+def _sysex(raw: bytes) -> DecodedMessage:
+    if raw[-1] != EOX:
+        raise ValueError("System exclusive message must end with EOX")
+    data = memoryview(raw)[1:-1]  # View on the raw message to avoid copying large payloads
+    if max(data, default=0) > 0x7F:
+        raise ValueError(f"Data byte must be in range 0..127, not {max(data)}")
+    return DecodedMessage(raw, SYSEX, 'sysex', None, "Data", data)
+
+
+def _quarter_frame(raw: bytes) -> DecodedMessage:
+    _check_length(raw, 2)
+    # TODO: decode
+    return DecodedMessage(raw, QUARTER_FRAME, 'quarter_frame', None,
+                          "Frame type", raw[1] >> 4, None, "Frame value", raw[1] & 0x0F)
+
+
+def _songpos(raw: bytes) -> DecodedMessage:
+    _check_length(raw, 3)
+    return DecodedMessage(raw, SONGPOS, 'songpos', None, "Position Pointer", raw[1] | raw[2] << 7)
+
+
+def _song_select(raw: bytes) -> DecodedMessage:
+    _check_length(raw, 2)
+    return DecodedMessage(raw, SONG_SELECT, 'song_select', None, "Song #", raw[1])
+
+
+def _single_byte(message_type: str) -> Callable[[bytes], DecodedMessage]:
+    """Creates a handler for a message without data.
+
+    :param message_type: Message type name.
+    :return: Message handler.
+
+    """
+
+    def handler(raw: bytes) -> DecodedMessage:
+        _check_length(raw, 1)
+        return DecodedMessage(raw, raw[0], message_type)
+
+    return handler
+
+
+def _invalid(raw: bytes) -> DecodedMessage:
+    if raw[0] < 0x80:
+        raise ValueError(f"Message must start with a status byte, not {raw[0]:02X}")
+    raise ValueError(f"Undefined status byte {raw[0]:02X}")
+
+
+_CHANNEL_HANDLERS = {
+    NOTE_OFF: _note_off,
+    NOTE_ON: _note_on,
+    POLYTOUCH: _polytouch,
+    CONTROL_CHANGE: _control_change,
+    PROGRAM_CHANGE: _program_change,
+    AFTERTOUCH: _aftertouch,
+    PITCHWHEEL: _pitchwheel,
+}
+_SYSTEM_HANDLERS = {
+    SYSEX: _sysex,
+    QUARTER_FRAME: _quarter_frame,
+    SONGPOS: _songpos,
+    SONG_SELECT: _song_select,
+    0xF6: _single_byte('tune_request'),
+    0xF8: _single_byte('clock'),
+    0xFA: _single_byte('start'),
+    0xFB: _single_byte('continue'),
+    0xFC: _single_byte('stop'),
+    0xFE: _single_byte('active_sensing'),
+    0xFF: _single_byte('reset'),
+}
+HANDLERS: tuple[Callable[[bytes], DecodedMessage], ...] = tuple(
+    _CHANNEL_HANDLERS.get(status & 0xF0, _invalid) if status < 0xF0 else _SYSTEM_HANDLERS.get(status, _invalid)
+    for status in range(256)
+)  # By status byte
+
+
+def decode(raw: bytes) -> DecodedMessage:
+    """Decodes a raw MIDI message.
+
+    :param raw: Raw MIDI message.
+    :return: Decoded message.
+    :raises: ValueError -- The message is malformed.
+
+    """
+    if not raw:
+        raise ValueError("Empty message")
+    return HANDLERS[raw[0]](raw)
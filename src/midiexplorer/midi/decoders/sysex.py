@@ -8,27 +8,26 @@
 System Exclusive Decoders.
 """
 
-# TODO: separate into dedicated subdecoders?
-
-# TODO: decode sample dump standard (page 35)
-# ACK, NAK, Wait, Cancel & EOF
-# TODO: decode device inquiry (page 40)
-# TODO: decode file dump (page 41)
-# TODO: decode midi tuning (page 47)
-# TODO: decode general midi system messages (page 52)
-# TODO: decode MTC full message, user bits and real time cueing (page 53 + dedicated spec)
-# TODO: decode midi show control (page 53 + dedicated spec)
-# TODO: decode notation information (page 54)
-# TODO: decode device control (page 57)
-# TODO: decode MMC (page 58 + dedicated spec)
-
-import functools
+# Universal sub-decoders are registered from the universal module.
+# TODO: decode sample dump extensions (page 37)
+# TODO: decode midi tuning bank and scale/octave forms (page 47)
+# TODO: decode MTC real time cueing (page 53 + dedicated spec)
+# TODO: decode MMC commands data (page 58 + dedicated spec)
+
+from typing import Any
 
 import midi_const
 import mido
 
 
 class DecodedSysExId:
+    """System exclusive ID.
+
+    Instances are immutable and shared: use get_sysex_id() rather than creating new ones.
+
+    """
+    __slots__ = ('_len', '_raw', 'group', 'region', 'name')
+
     def __init__(self, value: int | tuple[int]):
         length: int
         try:
@@ -39,11 +38,36 @@ class DecodedSysExId:
             pass
         if length not in (1, 3):
             raise ValueError(f"A system exclusive ID can only be 1-byte or 3-bytes long, not {length}-bytes!")
-        self._len = length
         if isinstance(value, int):
             if value == 0:
                 raise ValueError("3-bytes must be provided when the first is 0x00.")
-        self._raw = value
+        else:
+            value = tuple(value)
+
+        if length == 1:
+            group = midi_const.SYSTEM_EXCLUSIVE_ID_GROUPS.get(value, "Undefined")
+            region = midi_const.SYSTEM_EXCLUSIVE_ID_REGIONS.get(value, "N.A.")
+            name = midi_const.SYSTEM_EXCLUSIVE_ID.get(value, "Undefined")
+        else:
+            group = midi_const.SYSTEM_EXCLUSIVE_ID_GROUPS.get(value[0], "Undefined")
+            region = midi_const.SYSTEM_EXCLUSIVE_ID_REGIONS.get(value[1], "N.A.")
+            name = midi_const.SYSTEM_EXCLUSIVE_ID.get(
+                value[0], {}
+            ).get(
+                value[1], {}
+            ).get(
+                value[2], "Undefined"
+            )
+
+        for attribute, attribute_value in (('_len', length), ('_raw', value),
+                                           ('group', group), ('region', region), ('name', name)):
+            object.__setattr__(self, attribute, attribute_value)
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __repr__(self) -> str:
+        return f"DecodedSysExId({self._raw!r}, {self.name!r})"
 
     @property
     def length(self) -> int:
@@ -53,72 +77,131 @@ class DecodedSysExId:
     def value(self) -> int | tuple[int]:
         return self._raw
 
-    @functools.cached_property
-    def group(self) -> str:
-        index: int
-        group: str
-        if self._len == 1:
-            index = self._raw
-        else:
-            index = self._raw[0]
-        group = midi_const.SYSTEM_EXCLUSIVE_ID_GROUPS.get(index, "Undefined")
-        return group
-
-    @functools.cached_property
-    def region(self) -> str:
-        index: int
-        region: str
-        if self._len == 1:
-            index = self._raw
-        else:
-            index = self._raw[1]
-        region = midi_const.SYSTEM_EXCLUSIVE_ID_REGIONS.get(index, "N.A.")
-        return region
-
-    @functools.cached_property
-    def name(self) -> str:
-        name: str = "Undefined"
-        if self._len == 1:
-            name = midi_const.SYSTEM_EXCLUSIVE_ID.get(self._raw, "Undefined")
-        else:
-            name = midi_const.SYSTEM_EXCLUSIVE_ID.get(
-                self._raw[0], {}
-            ).get(
-                self._raw[1], {}
-            ).get(
-                self._raw[2], name
-            )
-        return name
+
+def _build_sysex_ids() -> dict[int | tuple[int, int, int], DecodedSysExId]:
+    """Builds the system exclusive IDs registry.
+
+    Covers every 1-byte ID and the known 3-byte IDs.
+
+    :return: Shared IDs by value.
+
+    """
+    registry = {value: DecodedSysExId(value) for value in range(0x01, 0x80)}
+    for byte1, ids in midi_const.SYSTEM_EXCLUSIVE_ID[0x00].items():
+        for byte2 in ids:
+            registry[(0x00, byte1, byte2)] = DecodedSysExId((0x00, byte1, byte2))
+    return registry
+
+
+SYSEX_IDS = _build_sysex_ids()  # Flat registry by 1-byte value or 3-byte tuple
+
+
+def get_sysex_id(value: int | tuple[int, int, int]) -> DecodedSysExId:
+    """Retrieves the shared system exclusive ID.
+
+    Unknown 3-byte IDs are registered on first use.
+
+    :param value: 1-byte ID value or 3-byte ID tuple.
+    :return: System exclusive ID.
+    :raises: ValueError -- Invalid ID.
+
+    """
+    try:
+        return SYSEX_IDS[value]
+    except KeyError:
+        pass
+    identifier = DecodedSysExId(value)
+    if identifier.length == 3 and identifier.value[0] == 0x00 and max(identifier.value) <= 0x7F:
+        SYSEX_IDS[identifier.value] = identifier
+    return identifier
+
+
+SubDecoderKey = tuple[int | tuple[int, int, int], int | None, int | None]  # (ID, sub-ID#1, sub-ID#2)
+SUB_DECODERS: dict[SubDecoderKey, type['DecodedSysExPayload']] = {}  # Payload decoders registry
+
+
+def register_decoder(identifier: int | tuple[int, int, int], sub_id1: int | None = None, sub_id2: int | None = None):
+    """Class decorator registering a payload decoder.
+
+    :param identifier: System exclusive ID value.
+    :param sub_id1: First payload byte or None to match any.
+    :param sub_id2: Second payload byte or None to match any.
+    :return: Decorator.
+
+    """
+
+    def decorator(decoder: type['DecodedSysExPayload']) -> type['DecodedSysExPayload']:
+        SUB_DECODERS[(identifier, sub_id1, sub_id2)] = decoder
+        return decoder
+
+    return decorator
 
 
 class DecodedSysExPayload:
-    _id = int
-    _raw: int | tuple[int]
+    __slots__ = ('_id', '_raw')
+    _id: DecodedSysExId
+    _raw: memoryview
 
-    def __init__(self, identifier: DecodedSysExId, contents: int | tuple[int]):
+    def __init__(self, identifier: DecodedSysExId, contents: memoryview):
         self._id = identifier
         self._raw = contents
 
     @property
-    def value(self):
+    def value(self) -> memoryview:
         return self._raw
 
+    def fields(self) -> dict[str, Any]:
+        """Decoded payload fields.
+
+        :return: Values by field name.
+
+        """
+        return {}
+
     @staticmethod
-    def get_decoder(identifier):
-        if identifier.value == 0x7E:
-            return DecodedUniversalNonRealTimeSysExPayload
-        if identifier.value == 0x7F:
-            return DecodedUniversalRealTimeSysExPayload
-        return DecodedSysExPayload
+    def get_decoder(identifier: DecodedSysExId, contents: memoryview) -> type['DecodedSysExPayload']:
+        """Finds the most specific registered decoder.
+
+        :param identifier: System exclusive ID.
+        :param contents: Payload.
+        :return: Payload decoder.
+
+        """
+        value = identifier.value
+        length = len(contents)
+        sub_id1 = contents[0] if length > 0 else None
+        sub_id2 = contents[1] if length > 1 else None
+        return (SUB_DECODERS.get((value, sub_id1, sub_id2))
+                or SUB_DECODERS.get((value, sub_id1, None))
+                or SUB_DECODERS.get((value, None, None), DecodedSysExPayload))
 
 
 class DecodedUniversalSysExPayload(DecodedSysExPayload):
-    def __init__(self, identifier: DecodedSysExId, contents: int | tuple[int]):
+    __slots__ = ('sub_id1_value', 'sub_id1_name', 'sub_id2_value', 'sub_id2_name', '_data_start')
+
+    def __init__(self, identifier: DecodedSysExId, contents: memoryview):
         super().__init__(identifier, contents)
+        self.sub_id1_value: int | None = None
+        self.sub_id1_name: str | None = None
+        self.sub_id2_value: int | None = None
+        self.sub_id2_name: str | None = None
+        self._data_start = 1  # After the sub-ID(s)
 
+    @property
+    def data(self) -> memoryview:
+        """Payload data following the sub-ID(s).
 
+        :return: Data bytes.
+
+        """
+        return self._raw[self._data_start:]
+
+
+@register_decoder(0x7E)
 class DecodedUniversalNonRealTimeSysExPayload(DecodedUniversalSysExPayload):
-    def __init__(self, identifier: DecodedSysExId, contents: int | tuple[int]):
+    __slots__ = ()
+
+    def __init__(self, identifier: DecodedSysExId, contents: memoryview):
         if identifier.value != 0x7E:
             raise ValueError
         super().__init__(identifier, contents)
@@ -136,10 +219,14 @@ class DecodedUniversalNonRealTimeSysExPayload(DecodedUniversalSysExPayload):
                 ).get(
                 self.sub_id2_value, "Undefined"
             )
+        self._data_start = next_byte + 1
 
 
+@register_decoder(0x7F)
 class DecodedUniversalRealTimeSysExPayload(DecodedUniversalSysExPayload):
-    def __init__(self, identifier: DecodedSysExId, contents: int | tuple[int]):
+    __slots__ = ()
+
+    def __init__(self, identifier: DecodedSysExId, contents: memoryview):
         if identifier.value != 0x7F:
             raise ValueError
         super().__init__(identifier, contents)
@@ -157,40 +244,70 @@ class DecodedUniversalRealTimeSysExPayload(DecodedUniversalSysExPayload):
                 ).get(
                 self.sub_id2_value, "Undefined"
             )
+        self._data_start = next_byte + 1
 
 
 class DecodedSysEx:
-    def __init__(self, message: tuple):
-        if len(message) < 3:
+    """Decoded system exclusive message.
+
+    Operates on a view of the original buffer: the payload is never copied.
+
+    """
+    __slots__ = ('_raw', '_device_id_byte', 'identifier', '_decoded_payload')
+
+    def __init__(self, message: bytes | bytearray | memoryview | tuple):
+        """Decodes a system exclusive message.
+
+        :param message: System exclusive data without the leading SOX. EOX may be present.
+
+        """
+        if isinstance(message, tuple):
+            message = bytes(message)
+        raw = memoryview(message)
+        if len(raw) < 3:
             raise ValueError("Message too short (less than 3 bytes) to be a proper system exclusive message.")
         # Scrub EOX if present
-        if message[-1] == mido.messages.specs.SYSEX_END:
-            self._raw = message[:-1]
-        else:
-            self._raw = message
+        if raw[-1] == mido.messages.specs.SYSEX_END:
+            raw = raw[:-1]
+        self._raw = raw
+        self._decoded_payload = None
         # Determine ID length
-        if self._raw[0] == 0x00:
+        if raw[0] == 0x00:
             # 3-byte ID
             if len(message) < 5:
                 raise ValueError(
                     "Message too short (less than 5 bytes) to be a proper system exclusive message with a 3-byte ID."
                 )
             self._device_id_byte = 3
-            self.identifier = DecodedSysExId(self._raw[0:self._device_id_byte])
+            self.identifier = get_sysex_id((0x00, raw[1], raw[2]))
         else:
             # 1-byte ID
             self._device_id_byte = 1
-            self.identifier = DecodedSysExId(self._raw[0])
+            self.identifier = get_sysex_id(raw[0])
 
-    @functools.cached_property
+    @property
     def device_id(self) -> int:
         return self._raw[self._device_id_byte]
 
-    @functools.cached_property
-    def _payload(self) -> int | tuple[int]:
+    @property
+    def _payload(self) -> memoryview:
         return self._raw[self._device_id_byte + 1:]
 
-    @functools.cached_property
+    @property
     def payload(self) -> DecodedSysExPayload:
-        decoder = DecodedSysExPayload.get_decoder(self.identifier)
-        return decoder(self.identifier, self._payload)
+        if self._decoded_payload is None:
+            payload = self._payload
+            decoders = (
+                DecodedSysExPayload.get_decoder(self.identifier, payload),
+                SUB_DECODERS.get((self.identifier.value, None, None), DecodedSysExPayload),
+            )
+            for decoder in decoders:
+                try:
+                    self._decoded_payload = decoder(self.identifier, payload)
+                    break
+                except (IndexError, ValueError):
+                    # Malformed for this decoder: fall back to a more generic one
+                    continue
+            else:
+                self._decoded_payload = DecodedSysExPayload(self.identifier, payload)
+        return self._decoded_payload
@@ -0,0 +1,458 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Universal System Exclusive sub-decoders.
+
+Page numbers refer to the MIDI 1.0 Detailed Specification v4.2.1.
+"""
+from typing import Any
+
+import midi_const
+
+from midiexplorer.midi.decoders.sysex import DecodedSysExId, DecodedUniversalNonRealTimeSysExPayload, \
+    DecodedUniversalRealTimeSysExPayload, get_sysex_id, register_decoder
+
+NON_REAL_TIME = 0x7E
+REAL_TIME = 0x7F
+
+
+def _int7(data: memoryview) -> int:
+    """Decodes a multibyte 7-bit value, least significant byte first.
+
+    :param data: Data bytes.
+    :return: Value.
+
+    """
+    value = 0
+    for shift, byte in enumerate(data):
+        value |= byte << (7 * shift)
+    return value
+
+
+def _ascii(data: memoryview) -> str:
+    """Decodes an ASCII string.
+
+    :param data: Data bytes.
+    :return: Text.
+
+    """
+    return bytes(data).decode('ascii', errors='replace')
+
+
+def _require(data: memoryview, length: int) -> None:
+    """Validates the data length.
+
+    :param data: Data bytes.
+    :param length: Minimum expected length.
+    :raises: ValueError -- The data is too short.
+
+    """
+    if len(data) < length:
+        raise ValueError(f"Payload data too short: {len(data)} byte(s) instead of at least {length}.")
+
+
+###
+# Non Real Time
+###
+
+@register_decoder(NON_REAL_TIME, 0x01)
+class SampleDumpHeader(DecodedUniversalNonRealTimeSysExPayload):
+    """Sample dump header (page 35)."""
+    __slots__ = ('sample_number', 'sample_format', 'sample_period', 'sample_length', 'loop_start', 'loop_end',
+                 'loop_type')
+
+    def __init__(self, identifier: DecodedSysExId, contents: memoryview):
+        super().__init__(identifier, contents)
+        data = self.data
+        _require(data, 16)
+        self.sample_number = _int7(data[0:2])
+        self.sample_format = data[2]  # Significant bits
+        self.sample_period = _int7(data[3:6])  # ns
+        self.sample_length = _int7(data[6:9])  # words
+        self.loop_start = _int7(data[9:12])  # word number
+        self.loop_end = _int7(data[12:15])  # word number
+        self.loop_type = data[15]
+
+    def fields(self) -> dict[str, Any]:
+        return {
+            "Sample number": self.sample_number,
+            "Format (bits)": self.sample_format,
+            "Period (ns)": self.sample_period,
+            "Length (words)": self.sample_length,
+            "Loop start": self.loop_start,
+            "Loop end": self.loop_end,
+            "Loop type": {0x00: "Forward", 0x01: "Alternating", 0x7F: "Off"}.get(self.loop_type, self.loop_type),
+        }
+
+
+@register_decoder(NON_REAL_TIME, 0x02)
+class SampleDataPacket(DecodedUniversalNonRealTimeSysExPayload):
+    """Sample data packet (page 36)."""
+    __slots__ = ('packet_number', 'checksum')
+
+    def __init__(self, identifier: DecodedSysExId, contents: memoryview):
+        super().__init__(identifier, contents)
+        data = self.data
+        _require(data, 2)
+        self.packet_number = data[0]
+        self.checksum = data[-1]
+
+    @property
+    def sample_data(self) -> memoryview:
+        """Encoded sample data.
+
+        :return: Data bytes.
+
+        """
+        return self.data[1:-1]
+
+    def fields(self) -> dict[str, Any]:
+        return {
+            "Packet number": self.packet_number,
+            "Data length": len(self.sample_data),
+            "Checksum": self.checksum,
+        }
+
+
+@register_decoder(NON_REAL_TIME, 0x03)
+class SampleDumpRequest(DecodedUniversalNonRealTimeSysExPayload):
+    """Sample dump request (page 36)."""
+    __slots__ = ('sample_number',)
+
+    def __init__(self, identifier: DecodedSysExId, contents: memoryview):
+        super().__init__(identifier, contents)
+        data = self.data
+        _require(data, 2)
+        self.sample_number = _int7(data[0:2])
+
+    def fields(self) -> dict[str, Any]:
+        return {"Sample number": self.sample_number}
+
+
+@register_decoder(NON_REAL_TIME, 0x7B)
+@register_decoder(NON_REAL_TIME, 0x7C)
+@register_decoder(NON_REAL_TIME, 0x7D)
+@register_decoder(NON_REAL_TIME, 0x7E)
+@register_decoder(NON_REAL_TIME, 0x7F)
+class Handshake(DecodedUniversalNonRealTimeSysExPayload):
+    """Handshaking flags: EOF, Wait, Cancel, NAK & ACK (page 35)."""
+    __slots__ = ('packet_number',)
+
+    def __init__(self, identifier: DecodedSysExId, contents: memoryview):
+        super().__init__(identifier, contents)
+        data = self.data
+        _require(data, 1)
+        self.packet_number = data[0]
+
+    def fields(self) -> dict[str, Any]:
+        return {"Packet number": self.packet_number}
+
+
+@register_decoder(NON_REAL_TIME, 0x06, 0x01)
+class IdentityRequest(DecodedUniversalNonRealTimeSysExPayload):
+    """Device inquiry: identity request (page 40)."""
+    __slots__ = ()
+
+
+@register_decoder(NON_REAL_TIME, 0x06, 0x02)
+class IdentityReply(DecodedUniversalNonRealTimeSysExPayload):
+    """Device inquiry: identity reply (page 40)."""
+    __slots__ = ('manufacturer', 'family', 'member', 'version')
+
+    def __init__(self, identifier: DecodedSysExId, contents: memoryview):
+        super().__init__(identifier, contents)
+        data = self.data
+        _require(data, 1)
+        if data[0] == 0x00:
+            _require(data, 11)
+            self.manufacturer = get_sysex_id((0x00, data[1], data[2]))
+            data = data[3:]
+        else:
+            _require(data, 9)
+            self.manufacturer = get_sysex_id(data[0])
+            data = data[1:]
+        self.family = _int7(data[0:2])
+        self.member = _int7(data[2:4])
+        self.version = tuple(data[4:8])
+
+    def fields(self) -> dict[str, Any]:
+        return {
+            "Manufacturer": self.manufacturer.name,
+            "Family": self.family,
+            "Member": self.member,
+            "Version": '.'.join(str(number) for number in self.version),
+        }
+
+
+@register_decoder(NON_REAL_TIME, 0x07, 0x01)
+class FileDumpHeader(DecodedUniversalNonRealTimeSysExPayload):
+    """File dump header (page 41)."""
+    __slots__ = ('sender', 'file_type', 'file_length', 'file_name')
+
+    def __init__(self, identifier: DecodedSysExId, contents: memoryview):
+        super().__init__(identifier, contents)
+        data = self.data
+        _require(data, 9)
+        self.sender = data[0]
+        self.file_type = _ascii(data[1:5])
+        self.file_length = _int7(data[5:9])
+        self.file_name = _ascii(data[9:])
+
+    def fields(self) -> dict[str, Any]:
+        return {
+            "Sender device ID": self.sender,
+            "Type": self.file_type,
+            "Length": self.file_length,
+            "Name": self.file_name,
+        }
+
+
+@register_decoder(NON_REAL_TIME, 0x07, 0x02)
+class FileDumpDataPacket(DecodedUniversalNonRealTimeSysExPayload):
+    """File dump data packet (page 42)."""
+    __slots__ = ('packet_number', 'byte_count', 'checksum')
+
+    def __init__(self, identifier: DecodedSysExId, contents: memoryview):
+        super().__init__(identifier, contents)
+        data = self.data
+        _require(data, 3)
+        self.packet_number = data[0]
+        self.byte_count = data[1] + 1  # Encoded data bytes
+        self.checksum = data[-1]
+
+    def fields(self) -> dict[str, Any]:
+        return {
+            "Packet number": self.packet_number,
+            "Data length": self.byte_count,
+            "Checksum": self.checksum,
+        }
+
+
+@register_decoder(NON_REAL_TIME, 0x07, 0x03)
+class FileDumpRequest(DecodedUniversalNonRealTimeSysExPayload):
+    """File dump request (page 42)."""
+    __slots__ = ('requester', 'file_type', 'file_name')
+
+    def __init__(self, identifier: DecodedSysExId, contents: memoryview):
+        super().__init__(identifier, contents)
+        data = self.data
+        _require(data, 5)
+        self.requester = data[0]
+        self.file_type = _ascii(data[1:5])
+        self.file_name = _ascii(data[5:])
+
+    def fields(self) -> dict[str, Any]:
+        return {
+            "Requester device ID": self.requester,
+            "Type": self.file_type,
+            "Name": self.file_name,
+        }
+
+
+@register_decoder(NON_REAL_TIME, 0x08, 0x00)
+class TuningDumpRequest(DecodedUniversalNonRealTimeSysExPayload):
+    """MIDI tuning bulk dump request (page 47)."""
+    __slots__ = ('program',)
+
+    def __init__(self, identifier: DecodedSysExId, contents: memoryview):
+        super().__init__(identifier, contents)
+        data = self.data
+        _require(data, 1)
+        self.program = data[0]
+
+    def fields(self) -> dict[str, Any]:
+        return {"Tuning program": self.program}
+
+
+@register_decoder(NON_REAL_TIME, 0x08, 0x01)
+class TuningDumpReply(DecodedUniversalNonRealTimeSysExPayload):
+    """MIDI tuning bulk dump reply (page 48)."""
+    __slots__ = ('program', 'name', 'checksum')
+
+    def __init__(self, identifier: DecodedSysExId, contents: memoryview):
+        super().__init__(identifier, contents)
+        data = self.data
+        _require(data, 1 + 16 + 128 * 3 + 1)
+        self.program = data[0]
+        self.name = _ascii(data[1:17]).rstrip()
+        self.checksum = data[-1]
+
+    def tuning(self, note: int) -> float:
+        """Tuning of a note.
+
+        :param note: MIDI note number.
+        :return: Frequency as a fractional MIDI note number.
+
+        """
+        offset = 17 + note * 3
+        semitone, fraction = self.data[offset], self.data[offset + 1] << 7 | self.data[offset + 2]
+        return semitone + fraction / 0x4000
+
+    def fields(self) -> dict[str, Any]:
+        return {
+            "Tuning program": self.program,
+            "Name": self.name,
+            "Checksum": self.checksum,
+        }
+
+
+###
+# Real Time
+###
+
+@register_decoder(REAL_TIME, 0x01, 0x01)
+class MTCFullMessage(DecodedUniversalRealTimeSysExPayload):
+    """MIDI Time Code full message (page 53 + MTC specification)."""
+    __slots__ = ('rate', 'hours', 'minutes', 'seconds', 'frames')
+
+    def __init__(self, identifier: DecodedSysExId, contents: memoryview):
+        super().__init__(identifier, contents)
+        data = self.data
+        _require(data, 4)
+        self.rate = (data[0] & 0x60) >> 5
+        self.hours = data[0] & 0x1F
+        self.minutes = data[1]
+        self.seconds = data[2]
+        self.frames = data[3]
+
+    def fields(self) -> dict[str, Any]:
+        return {
+            "Type": midi_const.MTC_TIME_CODE_TYPES[self.rate],
+            "Time": f"{self.hours:02d}:{self.minutes:02d}:{self.seconds:02d}:{self.frames:02d}",
+        }
+
+
+@register_decoder(REAL_TIME, 0x01, 0x02)
+class MTCUserBits(DecodedUniversalRealTimeSysExPayload):
+    """MIDI Time Code user bits (page 53 + MTC specification)."""
+    __slots__ = ('user_bits',)
+
+    def __init__(self, identifier: DecodedSysExId, contents: memoryview):
+        super().__init__(identifier, contents)
+        data = self.data
+        _require(data, midi_const.MTC_USER_BITS_EXPECTED_DATA_LENGTH)
+        self.user_bits = tuple(data[0:midi_const.MTC_USER_BITS_EXPECTED_DATA_LENGTH])
+
+    def fields(self) -> dict[str, Any]:
+        return {midi_const.MTC_USER_BITS_DATA_FIELDS[index]: bits for index, bits in enumerate(self.user_bits)}
+
+
+@register_decoder(REAL_TIME, 0x02)
+class ShowControl(DecodedUniversalRealTimeSysExPayload):
+    """MIDI Show Control (page 53 + MSC specification).
+
+    The sub-ID#2 is the command format.
+
+    """
+    __slots__ = ('command',)
+
+    def __init__(self, identifier: DecodedSysExId, contents: memoryview):
+        super().__init__(identifier, contents)
+        data = self.data
+        _require(data, 1)
+        self.sub_id2_name = midi_const.MSC_COMMAND_FORMAT.get(self.sub_id2_value, "Undefined")
+        self.command = data[0]
+
+    def fields(self) -> dict[str, Any]:
+        command = (midi_const.MSC_GENERAL_COMMANDS.get(self.command)
+                   or midi_const.MSC_SOUND_COMMANDS.get(self.command)
+                   or midi_const.MSC_TWO_PHASE_COMMIT_COMMANDS.get(self.command, "Undefined"))
+        return {
+            "Command format": self.sub_id2_name,
+            "Command": command,
+            "Data": _ascii(self.data[1:]),
+        }
+
+
+@register_decoder(REAL_TIME, 0x03, 0x01)
+class BarNumber(DecodedUniversalRealTimeSysExPayload):
+    """Notation information: bar number (page 54)."""
+    __slots__ = ('bar',)
+
+    def __init__(self, identifier: DecodedSysExId, contents: memoryview):
+        super().__init__(identifier, contents)
+        data = self.data
+        _require(data, 2)
+        bar = _int7(data[0:2])
+        self.bar = bar - 0x4000 if bar & 0x2000 else bar  # Signed
+
+    def fields(self) -> dict[str, Any]:
+        label = {-0x2000: "Not running", 0x1FFF: "Running, unknown"}.get(self.bar, self.bar)
+        return {"Bar number": label}
+
+
+@register_decoder(REAL_TIME, 0x03, 0x02)
+@register_decoder(REAL_TIME, 0x03, 0x03)
+class TimeSignature(DecodedUniversalRealTimeSysExPayload):
+    """Notation information: time signature, immediate or delayed (page 55)."""
+    __slots__ = ('signatures', 'clocks', 'notes')
+
+    def __init__(self, identifier: DecodedSysExId, contents: memoryview):
+        super().__init__(identifier, contents)
+        data = self.data
+        _require(data, 5)
+        length = min(data[0], len(data) - 1)
+        self.signatures = [(data[1], 1 << data[2])]
+        self.clocks = data[3]  # MIDI clocks per metronome click
+        self.notes = data[4]  # 32nd notes per MIDI quarter note
+        for index in range(5, length, 2):
+            self.signatures.append((data[index], 1 << data[index + 1]))
+
+    def fields(self) -> dict[str, Any]:
+        return {
+            "Time signature": ' + '.join(f"{numerator}/{denominator}" for numerator, denominator in self.signatures),
+            "Clocks per click": self.clocks,
+            "32nd notes per quarter": self.notes,
+        }
+
+
+@register_decoder(REAL_TIME, 0x04, 0x01)
+@register_decoder(REAL_TIME, 0x04, 0x02)
+@register_decoder(REAL_TIME, 0x04, 0x03)
+@register_decoder(REAL_TIME, 0x04, 0x04)
+class DeviceControl(DecodedUniversalRealTimeSysExPayload):
+    """Device control: master volume, balance, fine and coarse tuning (page 57)."""
+    __slots__ = ('setting',)
+
+    def __init__(self, identifier: DecodedSysExId, contents: memoryview):
+        super().__init__(identifier, contents)
+        data = self.data
+        _require(data, 2)
+        self.setting = _int7(data[0:2])
+
+    def fields(self) -> dict[str, Any]:
+        if self.sub_id2_value == 0x04:  # Coarse tuning only uses the MSB
+            value = (self.setting >> 7) - 0x40
+        elif self.sub_id2_value in (0x02, 0x03):  # Centered
+            value = self.setting - 0x2000
+        else:
+            value = self.setting
+        return {self.sub_id2_name: value}
+
+
+@register_decoder(REAL_TIME, 0x08, 0x02)
+class TuningNoteChange(DecodedUniversalRealTimeSysExPayload):
+    """MIDI tuning single note tuning change (page 49)."""
+    __slots__ = ('program', 'changes')
+
+    def __init__(self, identifier: DecodedSysExId, contents: memoryview):
+        super().__init__(identifier, contents)
+        data = self.data
+        _require(data, 2)
+        self.program = data[0]
+        count = data[1]
+        _require(data, 2 + count * 4)
+        self.changes = [
+            (data[offset], data[offset + 1] + (data[offset + 2] << 7 | data[offset + 3]) / 0x4000)
+            for offset in range(2, 2 + count * 4, 4)
+        ]  # (Note, fractional MIDI note number)
+
+    def fields(self) -> dict[str, Any]:
+        return {
+            "Tuning program": self.program,
+            "Changes": ', '.join(f"{note}: {tuning:.4f}" for note, tuning in self.changes),
+        }
@@ -8,20 +8,50 @@
 MIDI ports helpers.
 """
 
-import multiprocessing
 import platform
-import threading
 from abc import ABC
 from functools import cached_property
 
 import mido
 
 from midiexplorer.gui.helpers.logger import Logger
-from midiexplorer.midi.timestamp import Timestamp
+from midiexplorer.midi.decoders.assembler import DEFAULT_MAX_SIZE, Event, SysExAssembler
+from midiexplorer.midi.decoders.message import SYSEX
+from midiexplorer.midi.ringbuffer import RingBuffer
+from midiexplorer.midi import timestamp
 
-# TODO: MIDI Input Queue Singleton?
-midi_in_lock = threading.Lock()
-midi_in_queue = multiprocessing.SimpleQueue()
+midi_in_ports: list['MidiInPort'] = []  # Opened input ports
+sysex_max_size = DEFAULT_MAX_SIZE  # Maximum received system exclusive message size (bytes)
+
+
+def set_sysex_max_size(size: int) -> None:
+    """Sets the maximum received system exclusive message size.
+
+    Applies to the opened input ports as well as the ones opened later.
+
+    :param size: Maximum size (bytes).
+
+    """
+    global sysex_max_size
+
+    sysex_max_size = size
+    for port in midi_in_ports:
+        port.assembler.max_size = size
+
+
+def receive_pending(out: list) -> int:
+    """Retrieves the messages pending in all opened input ports at once.
+
+    :param out: List to append (timestamp, port, data) entries to, in chronological order.
+    :return: Number of messages appended.
+
+    """
+    batch = []
+    for port in midi_in_ports:
+        port.queue.drain(batch, port)
+    batch.sort(key=lambda entry: entry[0].ns)
+    out.extend(batch)
+    return len(batch)
 
 
 class MidiPort(ABC):
@@ -94,6 +124,20 @@ class MidiOutPort(MidiPort):
         """
         self.port = mido.open_output(self.name)
 
+    def send_raw(self, data: bytes) -> None:
+        """Sends a raw message.
+
+        Bypasses Mido's message objects when the backend allows it.
+
+        :param data: Raw MIDI message bytes.
+
+        """
+        rtmidi_out = getattr(self.port, '_rt', None)
+        if rtmidi_out is None:
+            self.port.send(mido.Message.from_bytes(data))
+        else:
+            rtmidi_out.send_message(data)
+
 
 class MidiInPort(MidiPort):
     """Manages output ports.
@@ -103,15 +147,22 @@ class MidiInPort(MidiPort):
     """
     port: mido.ports.BaseInput
     dest: None | MidiOutPort | str = None  # We can only open the port once. Therefore, only one destination exists.
+    queue: RingBuffer  # Received messages. The port's receiving thread is its only producer.
+    assembler: SysExAssembler  # Reassembles chunked system exclusive messages in raw mode
+    sysex_progress: int = 0  # Size of the system exclusive message being received (bytes). Producer owned.
+    sysex_discarded: int = 0  # Incomplete or oversized system exclusive messages. Producer owned.
+    _raw: bool = False  # Whether the RtMidi callback is installed directly
 
     @property
     def mode(self) -> None:
         """Gives the mode in which the port operates.
 
-        :return: Either 'callback' or 'polling'.
+        :return: Either 'raw', 'callback' or 'polling'.
 
         """
-        if self.port.callback is not None:
+        if self._raw:
+            mode = 'raw'
+        elif self.port.callback is not None:
             mode = 'callback'
         else:
             mode = 'polling'
@@ -124,13 +175,27 @@ class MidiInPort(MidiPort):
 
         """
         self.dest = dest
+        self.queue = RingBuffer()
+        self.assembler = SysExAssembler(sysex_max_size)
+        self.sysex_progress = 0
+        self.sysex_discarded = 0
         self.port = mido.open_input(self.name)
+        midi_in_ports.append(self)
 
     def close(self) -> None:
         """Closes the port.
 
         """
-        self.port.callback = None
+        self.polling()
+        if self in midi_in_ports:
+            midi_in_ports.remove(self)
+        if self.queue.dropped or self.queue.overwritten:
+            Logger().log_warning(f"{self.label} input queue overflowed: "
+                                 f"{self.queue.dropped} message(s) dropped, "
+                                 f"{self.queue.overwritten} message(s) overwritten.")
+        if self.sysex_discarded:
+            Logger().log_warning(f"{self.label} discarded {self.sysex_discarded} "
+                                 f"incomplete or oversized system exclusive message(s).")
         self.dest = None
         super().close()
 
@@ -139,9 +204,21 @@ class MidiInPort(MidiPort):
 
         This is the recommended mode for the best performance.
 
+        Uses the raw mode when the backend allows it:
+        the RtMidi callback is then installed directly and bypasses Mido's parser.
+
         """
-        with midi_in_lock:
+        rtmidi_in = getattr(self.port, '_rt', None)
+        if rtmidi_in is None:
             self.port.callback = self.receive_callback
+            return
+
+        rtmidi_in.cancel_callback()
+        # Keep messages already parsed by Mido
+        for midi_message in self.port.iter_pending():
+            self.receive_callback(midi_message)
+        rtmidi_in.set_callback(self.receive_raw_callback)
+        self._raw = True
 
     def polling(self) -> None:
         """Sets the port in polling mode.
@@ -149,7 +226,8 @@ class MidiInPort(MidiPort):
         Not recommended except when the need to debug arises.
 
         """
-        self.port.callback = None
+        self._raw = False
+        self.port.callback = None  # Also reinstalls Mido's own RtMidi callback
 
     def receive_callback(self, midi_message: mido.Message) -> None:
         """Processes the messages received in callback mode.
@@ -158,10 +236,35 @@ class MidiInPort(MidiPort):
 
         """
         # Get the system timestamp ASAP
-        timestamp = Timestamp()
+        now = timestamp.now()
+
+        self.queue.push(bytes(midi_message.bytes()), now)
+
+    def receive_raw_callback(self, event: tuple[list[int], float], _=None) -> None:
+        """Processes the messages received in raw mode.
 
-        logger = Logger()
-        logger.log_debug(f"Callback data: {midi_message} from {self.label} to {self.dest}")
+        Runs in the RtMidi thread so only the bytes and the timestamp are captured.
+        Decoding is left to the consumers actually needing it.
+        System exclusive messages delivered in chunks are reassembled first.
 
-        with midi_in_lock:
-            midi_in_queue.put((timestamp, self.label, self.dest, midi_message))
+        :param event: The received MIDI message bytes and RtMidi delta time.
+        :param _: RtMidi callback user data is ignored.
+
+        """
+        # Get the system timestamp ASAP
+        now = timestamp.now()
+
+        data = bytes(event[0])
+        if data[0] != SYSEX and not self.assembler.pending:
+            self.queue.push(data, now)
+            return
+
+        for kind, value in self.assembler.feed(data):
+            if kind == Event.MESSAGE:
+                self.queue.push(value, now)
+            elif kind == Event.PROGRESS:
+                self.sysex_progress = value
+            else:
+                self.sysex_discarded += 1
+        if not self.assembler.pending:
+            self.sysex_progress = 0
@@ -0,0 +1,130 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Lock-free MIDI ingest ring buffer.
+"""
+from array import array
+from enum import IntEnum
+from typing import Any
+
+from midiexplorer.midi.timestamp import Timestamp
+
+
+class Overflow(IntEnum):
+    """Ring buffer overflow policies.
+
+    """
+    DROP_NEWEST = 0  # Reject incoming messages while the buffer is full
+    DROP_OLDEST = 1  # Overwrite the oldest unread messages
+
+
+class RingBuffer:
+    """Preallocated single-producer/single-consumer ring buffer for raw MIDI messages.
+
+    Each slot stores the raw message bytes alongside its timestamp and delta in array-backed columns.
+    Deltas are computed on push so they are relative to the previous message of this buffer's source.
+    The producer only ever writes the tail index and the dropped counter
+    while the consumer only ever writes the head index and the overwritten counter.
+    No lock is therefore required as long as there is a single thread on each side.
+
+    A per-slot sequence number is written last by the producer
+    so that the consumer can detect slots overwritten while being read.
+
+    """
+
+    def __init__(self, capacity: int = 4096, overflow: Overflow = Overflow.DROP_NEWEST) -> None:
+        """Preallocates the ring buffer.
+
+        :param capacity: Number of slots. Rounded up to the next power of two.
+        :param overflow: Policy to apply when the buffer is full.
+
+        """
+        capacity = 1 << max(capacity - 1, 1).bit_length()
+        self._capacity = capacity
+        self._mask = capacity - 1
+        self._data: list[bytes] = [b''] * capacity
+        self._timestamps = array('q', bytes(8 * capacity))
+        self._deltas = array('q', bytes(8 * capacity))
+        self._sequences = array('q', [-1]) * capacity
+        self._head = 0  # Next slot to read. Consumer owned.
+        self._tail = 0  # Next slot to write. Producer owned.
+        self._last: int | None = None  # Last pushed timestamp. Producer owned.
+        self.overflow = overflow
+        self.dropped = 0  # Rejected incoming messages. Producer owned.
+        self.overwritten = 0  # Lost unread messages. Consumer owned.
+
+    def __len__(self) -> int:
+        return min(self._tail - self._head, self._capacity)
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of messages the buffer can hold.
+
+        :return: Number of slots.
+
+        """
+        return self._capacity
+
+    def empty(self) -> bool:
+        """Checks for pending messages.
+
+        :return: Whether the buffer is empty.
+
+        """
+        return self._tail == self._head
+
+    def push(self, data: bytes, timestamp: int) -> bool:
+        """Appends a message. Producer side.
+
+        :param data: Raw MIDI message bytes.
+        :param timestamp: Message timestamp (nanoseconds).
+        :return: Whether the message has been stored.
+
+        """
+        last = self._last
+        self._last = timestamp
+        tail = self._tail
+        if tail - self._head >= self._capacity and self.overflow == Overflow.DROP_NEWEST:
+            self.dropped += 1
+            return False
+        # With DROP_OLDEST, lapped slots are accounted for by the consumer.
+        slot = tail & self._mask
+        self._sequences[slot] = -1  # Mark the slot as being written
+        self._data[slot] = data
+        self._timestamps[slot] = timestamp
+        self._deltas[slot] = timestamp - last if last is not None else 0
+        self._sequences[slot] = tail  # Publish
+        self._tail = tail + 1
+        return True
+
+    def drain(self, out: list, source: Any) -> int:
+        """Moves all pending messages to a list in one go. Consumer side.
+
+        :param out: List to append (timestamp, source, data) entries to.
+        :param source: Identifies the owner of this buffer in the appended entries.
+        :return: Number of messages appended.
+
+        """
+        tail = self._tail
+        head = self._head
+        if tail - head > self._capacity:
+            # The producer lapped us
+            self.overwritten += tail - self._capacity - head
+            head = tail - self._capacity
+        count = 0
+        while head < tail:
+            slot = head & self._mask
+            ns, delta_ns, data = self._timestamps[slot], self._deltas[slot], self._data[slot]
+            if self._sequences[slot] == head:
+                out.append((Timestamp(ns, delta_ns), source, data))
+                count += 1
+            else:
+                # Overwritten while reading
+                self.overwritten += 1
+            head += 1
+        self._head = head
+        return count
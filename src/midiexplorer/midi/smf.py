@@ -0,0 +1,335 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Standard MIDI File (SMF) reader.
+
+Memory maps the file and indexes its chunks and track events by byte offset.
+Events are only delimited, not decoded, so that the index maps file portions to events and back.
+"""
+import mmap
+from array import array
+from bisect import bisect_left, bisect_right
+
+from midiexplorer.midi.decoders.message import EOX, SYSEX
+
+HEADER = b'MThd'
+TRACK = b'MTrk'
+CHUNK_HEADER_SIZE = 8  # Type and length
+HEADER_MIN_LENGTH = 6  # Format, number of tracks and division
+META = 0xFF
+DATA_LENGTHS = {  # Channel message data bytes by status high nibble
+    0x80: 2,
+    0x90: 2,
+    0xA0: 2,
+    0xB0: 2,
+    0xC0: 1,
+    0xD0: 1,
+    0xE0: 2,
+}
+
+
+class Chunk:
+    """SMF chunk location.
+
+    """
+    __slots__ = ('type', 'offset', 'length')
+
+    def __init__(self, chunk_type: bytes, offset: int, length: int) -> None:
+        """Creates the chunk.
+
+        :param chunk_type: 4 characters chunk type.
+        :param offset: Chunk header position in the file.
+        :param length: Chunk data length, excluding the chunk header.
+
+        """
+        self.type = chunk_type
+        self.offset = offset
+        self.length = length
+
+    def __repr__(self) -> str:
+        return f"Chunk({self.type!r}, {self.offset}, {self.length})"
+
+    @property
+    def start(self) -> int:
+        """Chunk data position in the file.
+
+        :return: Offset.
+
+        """
+        return self.offset + CHUNK_HEADER_SIZE
+
+    @property
+    def end(self) -> int:
+        """Position following the chunk in the file.
+
+        :return: Offset.
+
+        """
+        return self.start + self.length
+
+
+class Track:
+    """Track chunk events index.
+
+    Events are stored in array-backed columns ordered by offset, and therefore by absolute tick.
+
+    """
+    __slots__ = ('chunk', 'offsets', 'lengths', 'ticks', 'statuses')
+
+    def __init__(self, chunk: Chunk) -> None:
+        """Creates an empty index.
+
+        :param chunk: Track chunk.
+
+        """
+        self.chunk = chunk
+        self.offsets = array('Q')  # Event positions in the file, including the delta-time
+        self.lengths = array('L')  # Event lengths, including the delta-time
+        self.ticks = array('Q')  # Event absolute times
+        self.statuses = array('B')  # Event status bytes with running status resolved
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def span(self, event: int) -> tuple[int, int]:
+        """Locates an event in the file.
+
+        :param event: Event index.
+        :return: Offset and length.
+
+        """
+        return self.offsets[event], self.lengths[event]
+
+    def find(self, offset: int) -> int | None:
+        """Finds the event containing a file position.
+
+        :param offset: Position in the file.
+        :return: Event index or None if the position isn't part of an event.
+
+        """
+        event = bisect_right(self.offsets, offset) - 1
+        if event < 0 or offset >= self.offsets[event] + self.lengths[event]:
+            return None
+        return event
+
+    def seek(self, tick: int) -> int:
+        """Finds the first event at or after an absolute time.
+
+        :param tick: Absolute time.
+        :return: Event index. Equals the number of events when past the end of the track.
+
+        """
+        return bisect_left(self.ticks, tick)
+
+
+def _read_vlq(buffer: mmap.mmap, position: int, end: int) -> tuple[int, int]:
+    """Reads a variable-length quantity.
+
+    :param buffer: File contents.
+    :param position: Quantity position.
+    :param end: Position after the last readable byte.
+    :return: Value and position following the quantity.
+    :raises: ValueError -- Truncated or longer than 4 bytes.
+
+    """
+    value = 0
+    for position in range(position, min(position + 4, end)):
+        byte = buffer[position]
+        value = (value << 7) | (byte & 0x7F)
+        if byte < 0x80:
+            return value, position + 1
+    raise ValueError(f"Invalid variable-length quantity at offset 0x{position:X}.")
+
+
+def _index_track(buffer: mmap.mmap, chunk: Chunk) -> Track:
+    """Delimits the events of a track chunk.
+
+    :param buffer: File contents.
+    :param chunk: Track chunk.
+    :return: Events index.
+    :raises: ValueError -- Malformed event.
+
+    """
+    track = Track(chunk)
+    offsets_append = track.offsets.append
+    lengths_append = track.lengths.append
+    ticks_append = track.ticks.append
+    statuses_append = track.statuses.append
+    position = chunk.start
+    end = chunk.end
+    tick = 0
+    running_status = None
+    while position < end:
+        start = position
+        delta, position = _read_vlq(buffer, position, end)
+        tick += delta
+        if position >= end:
+            raise ValueError(f"Event without status at offset 0x{start:X}.")
+        status = buffer[position]
+        if status < 0x80:
+            if running_status is None:
+                raise ValueError(f"Data byte without running status at offset 0x{position:X}.")
+            status = running_status
+            position += DATA_LENGTHS[status & 0xF0]
+        elif status == META:
+            if position + 1 >= end:
+                raise ValueError(f"Truncated meta event at offset 0x{start:X}.")
+            length, position = _read_vlq(buffer, position + 2, end)
+            position += length
+            # Running status is kept across meta and system exclusive events, like mido does.
+            # The SMF specification has them cancel it, but many files rely on it.
+        elif status in (SYSEX, EOX):
+            length, position = _read_vlq(buffer, position + 1, end)
+            position += length
+        elif status > SYSEX:
+            raise ValueError(f"Invalid status 0x{status:02X} in a track at offset 0x{position:X}.")
+        else:
+            running_status = status
+            position += 1 + DATA_LENGTHS[status & 0xF0]
+        if position > end:
+            raise ValueError(f"Event exceeding the track chunk at offset 0x{start:X}.")
+        offsets_append(start)
+        lengths_append(position - start)
+        ticks_append(tick)
+        statuses_append(status)
+    return track
+
+
+class StandardMidiFile:
+    """Memory mapped SMF with its chunks and events index.
+
+    The file contents are never copied: the map is read in place and can be shared with the GUI.
+    The file is indexed separately from being mapped so that any file can at least be displayed raw.
+
+    """
+    __slots__ = ('filename', 'buffer', 'format', 'tracks_count', 'division', 'header', 'chunks', 'tracks',
+                 '_chunk_offsets', '_chunk_tracks')
+
+    def __init__(self, filename: str) -> None:
+        """Maps the file.
+
+        :param filename: File path.
+        :raises: OSError -- File access error.
+        :raises: ValueError -- Empty file.
+
+        """
+        self.filename = filename
+        with open(filename, 'rb') as file:
+            # The map stays valid once the file is closed
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._reset()
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    def __enter__(self) -> 'StandardMidiFile':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unmaps the file.
+
+        """
+        self.buffer.close()
+
+    @property
+    def is_smf(self) -> bool:
+        """Whether the file starts with an SMF header chunk.
+
+        :return: SMF signature found.
+
+        """
+        return self.buffer[:len(HEADER)] == HEADER
+
+    def _read_int(self, position: int, length: int) -> int:
+        return int.from_bytes(self.buffer[position:position + length], 'big')
+
+    def _reset(self) -> None:
+        """Empties the index.
+
+        """
+        self.header: Chunk | None = None
+        self.format: int | None = None
+        self.tracks_count: int | None = None
+        self.division: int | None = None
+        self.chunks: list[Chunk] = []
+        self.tracks: list[Track] = []
+        self._chunk_offsets = array('Q')
+        self._chunk_tracks: list[int | None] = []  # Track index by chunk
+
+    def index(self) -> None:
+        """Walks the chunks and indexes the track events.
+
+        The index is left empty on error.
+
+        :raises: ValueError -- Malformed file.
+
+        """
+        try:
+            self._index()
+        except ValueError:
+            self._reset()
+            raise
+
+    def _index(self) -> None:
+        """Walks the chunks and indexes the track events.
+
+        :raises: ValueError -- Malformed file.
+
+        """
+        buffer = self.buffer
+        size = len(buffer)
+        position = 0
+        while position + CHUNK_HEADER_SIZE <= size:
+            chunk = Chunk(buffer[position:position + 4], position, self._read_int(position + 4, 4))
+            if chunk.end > size:
+                raise ValueError(f"Truncated {chunk.type!r} chunk at offset 0x{position:X}.")
+            if chunk.type == TRACK:
+                self._chunk_tracks.append(len(self.tracks))
+                self.tracks.append(_index_track(buffer, chunk))
+            else:
+                self._chunk_tracks.append(None)
+            self.chunks.append(chunk)
+            self._chunk_offsets.append(position)
+            position = chunk.end
+
+        if not self.chunks or self.chunks[0].type != HEADER or self.chunks[0].length < HEADER_MIN_LENGTH:
+            raise ValueError("Missing SMF header.")
+        self.header = self.chunks[0]
+        self.format = self._read_int(self.header.start, 2)
+        self.tracks_count = self._read_int(self.header.start + 2, 2)
+        self.division = self._read_int(self.header.start + 4, 2)
+
+    def chunk_at(self, offset: int) -> Chunk | None:
+        """Finds the chunk containing a file position.
+
+        :param offset: Position in the file.
+        :return: Chunk or None if outside any chunk.
+
+        """
+        index = bisect_right(self._chunk_offsets, offset) - 1
+        if index < 0 or offset >= self.chunks[index].end:
+            return None
+        return self.chunks[index]
+
+    def locate(self, offset: int) -> tuple[int, int | None] | None:
+        """Finds the track event containing a file position.
+
+        :param offset: Position in the file.
+        :return: Track and event indexes. The event is None for the chunk header.
+                 None if the position isn't part of a track.
+
+        """
+        index = bisect_right(self._chunk_offsets, offset) - 1
+        if index < 0 or offset >= self.chunks[index].end:
+            return None
+        track = self._chunk_tracks[index]
+        if track is None:
+            return None
+        return track, self.tracks[track].find(offset)
@@ -4,33 +4,77 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 """
-Timestamp singleton.
+Per-message timestamps.
 """
 import time
 
+S2NS = 1_000_000_000  # Seconds to nanoseconds ratio
+
+
+def now() -> int:
+    """Current time since application start.
+
+    :return: Elapsed nanoseconds.
+
+    """
+    return time.perf_counter_ns() - Timestamp.START_TIME_NS
+
 
 class Timestamp:
-    """Timestamp singleton.
-    
-    Allows sharing the latest timestamp globally.
-    
+    """Immutable message timestamp.
+
+    Compact integer nanoseconds since application start
+    alongside the delta to the previous message from the same source.
+
     """
-    __instance = None
-    START_TIME = time.perf_counter()  # Initialize ASAP (seconds)
-    value = 0  # Current timestamp (seconds)
-    delta = 0  # Delta to previous timestamp (seconds)
+    __slots__ = ('ns', 'delta_ns')
+    START_TIME_NS = time.perf_counter_ns()  # Initialize ASAP (nanoseconds)
+    START_TIME = START_TIME_NS / S2NS  # (seconds)
+
+    ns: int
+    delta_ns: int
+
+    def __init__(self, ns: int, delta_ns: int = 0) -> None:
+        """Instantiates a timestamp.
+
+        :param ns: Time since application start (nanoseconds).
+        :param delta_ns: Delta to the previous timestamp (nanoseconds).
+
+        """
+        object.__setattr__(self, 'ns', ns)
+        object.__setattr__(self, 'delta_ns', delta_ns)
+
+    def __setattr__(self, name, value) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(ns={self.ns}, delta_ns={self.delta_ns})"
+
+    @classmethod
+    def now(cls, previous: 'Timestamp | None' = None) -> 'Timestamp':
+        """Timestamps the present time.
+
+        :param previous: Previous timestamp from the same source, if any.
+        :return: A new timestamp.
+
+        """
+        ns = now()
+        return cls(ns, ns - previous.ns if previous is not None else 0)
+
+    @property
+    def value(self) -> float:
+        """Time since application start.
+
+        :return: Seconds.
+
+        """
+        return self.ns / S2NS
 
-    def __new__(cls) -> object:
-        """Instantiates a new timestamp or retrieves the existing one.
+    @property
+    def delta(self) -> float:
+        """Delta to the previous timestamp.
 
-        :return: A timestamp instance.
+        :return: Seconds.
 
         """
-        if Timestamp.__instance is None:
-            Timestamp.__instance = super(Timestamp, cls).__new__(cls)
-        return cls.__instance
-
-    def __init__(self):
-        now = time.perf_counter() - self.START_TIME
-        self.delta = now - self.value
-        self.value = now
+        return self.delta_ns / S2NS